@@ -1,5 +1,9 @@
+import asyncio
+import json
+from queue import Empty
 from typing import Optional  
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
 from pydantic import ValidationError
 from sqlalchemy.exc import SQLAlchemyError, IntegrityError
 
@@ -7,9 +11,23 @@ from app.model.orm import Citizen
 from app.api.deps import (
     SessionDep, get_current_active_superuser, get_current_user
 )
+from app.core.jobs import JobQueueFullError, matrix_cache_counters, optimizer_jobs
 from app.data.peru_data import apiNetPe
-from app.dto.optimizer import OptimizationRequest, OptimizationResult
-from scripts.optimizers.maximal_covering_location import MaximalCoveringLocation
+from app.core.config import settings
+from app.data.incidence import get_incidence_demand_cells
+from app.data.optimizer import get_optimization_result, save_optimization_result
+from app.dto.optimizer import (
+    OptimizationRequest, OptimizationResult, OptimizationJobOut, MatrixCacheStats,
+    IncidenceOptimizationRequest, IncidenceOptimizationResult, SweepRequest, SweepResult,
+    WhatIfRequest, WhatIfResult
+)
+from app.helpers.optimizer import (
+    to_optimization_job_out, to_matrix_cache_stats, to_solve_kwargs, to_solver_options,
+    to_seeded_solve_kwargs, optimization_request_hash, to_sweep_kwargs, to_what_if_kwargs
+)
+from scripts.optimizers.maximal_covering_location import (
+    solve_covering_location, sweep_covering_location, evaluate_configurations
+)
 
 from app.dto.utils import Message
 
@@ -18,16 +36,236 @@ router = APIRouter()
 
 
 @router.post("/optimize-covering-location", response_model=OptimizationResult)
-async def web_service_optimize_covering_location(request: OptimizationRequest):
+async def web_service_optimize_covering_location(
+        *, session: SessionDep, request: OptimizationRequest
+    ) -> OptimizationResult:
+    """
+    Solves are seeded (from the request hash when no seed is given) and their
+    results stored by request hash, so an identical request within the result
+    TTL is answered from the table instead of re-running the solver.
+    """
     try:
-        optimizer = MaximalCoveringLocation(
-            points=request.points,
-            demands=request.demands,
-            facilities=request.facilities,
-            max_facilities=request.max_facilities,
-            coverage_radius=request.coverage_radius
-        )
-        result = optimizer.solve()
+        request_hash = optimization_request_hash(request)
+        stored = await get_optimization_result(session=session, request_hash=request_hash)
+        if stored is not None:
+            return OptimizationResult(**stored, request_hash=request_hash, cached=True)
+        result = OptimizationResult(**await optimizer_jobs.run(
+            solve_covering_location,
+            **to_seeded_solve_kwargs(request, request_hash)
+        ))
+        await save_optimization_result(
+            session=session,
+            request_hash=request_hash,
+            result=result.model_dump(mode="json", exclude={"request_hash", "cached"}),
+            ttl_seconds=settings.OPTIMIZER_RESULT_TTL_SECONDS
+        )
+        result.request_hash = request_hash
         return result
+    except JobQueueFullError as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/sweep-covering-location", response_model=SweepResult)
+async def web_service_sweep_covering_location(request: SweepRequest) -> SweepResult:
+    """
+    Solve every (coverage_radius, max_facilities) pair of the grid in one call and
+    return the coverage-vs-k table, sorted by radius and then k.
+    """
+    try:
+        return await optimizer_jobs.run(
+            sweep_covering_location,
+            **to_sweep_kwargs(request)
+        )
+    except JobQueueFullError as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/what-if", response_model=WhatIfResult)
+async def web_service_evaluate_configurations(request: WhatIfRequest) -> WhatIfResult:
+    """
+    Score hand-picked 0/1 facility configurations (one flag per entry of
+    facilities) without running the optimizer: covered demand and the largest
+    uncovered demand points of each configuration.
+    """
+    if any(len(configuration) != len(request.facilities) for configuration in request.configurations):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Every configuration must have one 0/1 flag per facility.",
+        )
+    try:
+        evaluations = await optimizer_jobs.run(
+            evaluate_configurations,
+            **to_what_if_kwargs(request)
+        )
+        return WhatIfResult(evaluations=evaluations)
+    except JobQueueFullError as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/results/{request_hash}", response_model=OptimizationResult)
+async def web_service_read_optimization_result(
+        *, session: SessionDep, request_hash: str
+    ) -> OptimizationResult:
+    """
+    Stored result of a previous /optimize-covering-location request.
+    """
+    stored = await get_optimization_result(session=session, request_hash=request_hash)
+    if stored is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No stored optimization result found with hash: {request_hash}"
+        )
+    return OptimizationResult(**stored, request_hash=request_hash, cached=True)
+
+
+@router.post(
+    "/optimize-incidence-coverage",
+    dependencies=[Depends(get_current_user)],
+    response_model=IncidenceOptimizationResult
+)
+async def web_service_optimize_incidence_coverage(
+        *, session: SessionDep, request: IncidenceOptimizationRequest
+    ) -> IncidenceOptimizationResult:
+    """
+    Covering-location solve over demand cells aggregated from the incidence table.
+    Every demand cell is a candidate facility site, unless num_candidates asks
+    for a k-means candidate set.
+    """
+    try:
+        cells = await get_incidence_demand_cells(
+            session=session, filters=request.filters, cell_size=request.cell_size
+        )
+        if not cells:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="No located incidences match the filters.",
+            )
+        points = [(latitude, longitude) for latitude, longitude, _ in cells]
+        demands = [float(count) for _, _, count in cells]
+        result = await optimizer_jobs.run(
+            solve_covering_location,
+            points=points,
+            demands=demands,
+            # Every cell is a candidate unless k-means candidates are requested
+            facilities=None if request.num_candidates else list(range(len(points))),
+            **to_solver_options(request)
+        )
+        return IncidenceOptimizationResult(points=points, demands=demands, **result)
+    except HTTPException as e:
+        raise e
+    except JobQueueFullError as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+def to_server_sent_event(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@router.post("/optimize-covering-location/stream")
+async def web_service_stream_covering_location(
+        request: OptimizationRequest, http_request: Request, interval: float = 0.5
+    ) -> StreamingResponse:
+    """
+    Server-Sent Events variant: `progress` events with the best fitness and solution
+    at most every `interval` seconds, then a final `result` (or `error`) event.
+    The solve is stopped as soon as the client disconnects.
+    """
+    if interval <= 0:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="The interval parameter must be greater than 0.",
+        )
+    try:
+        progress_queue = optimizer_jobs.manager.Queue()
+        job = optimizer_jobs.submit(
+            solve_covering_location,
+            cancellable=True,
+            progress_queue=progress_queue,
+            progress_interval=interval,
+            **to_solve_kwargs(request)
+        )
+    except JobQueueFullError as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
+
+    async def events():
+        try:
+            while True:
+                finished = job.future.done()
+                while True:
+                    try:
+                        yield to_server_sent_event("progress", progress_queue.get_nowait())
+                    except Empty:
+                        break
+                if finished:
+                    break
+                if await http_request.is_disconnected():
+                    return
+                await asyncio.sleep(0.1)
+            if job.status == "completed":
+                result = OptimizationResult.model_validate(job.result)
+                yield to_server_sent_event("result", result.model_dump())
+            else:
+                yield to_server_sent_event("error", {"detail": job.error or job.status})
+        finally:
+            if not job.future.done():
+                optimizer_jobs.cancel(job.id)
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+@router.post(
+    "/jobs", response_model=OptimizationJobOut, status_code=status.HTTP_202_ACCEPTED
+)
+async def web_service_submit_optimization_job(request: OptimizationRequest) -> OptimizationJobOut:
+    """
+    Queue a covering-location solve and return its job id.
+    """
+    try:
+        job = optimizer_jobs.submit(
+            solve_covering_location,
+            cancellable=True,
+            **to_solve_kwargs(request)
+        )
+        return to_optimization_job_out(job)
+    except JobQueueFullError as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/jobs/{job_id}", response_model=OptimizationJobOut)
+async def web_service_read_optimization_job(job_id: str) -> OptimizationJobOut:
+    job = optimizer_jobs.get(job_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No optimization job found with ID: {job_id}"
+        )
+    return to_optimization_job_out(job)
+
+
+@router.post("/jobs/{job_id}/cancel", response_model=OptimizationJobOut)
+async def web_service_cancel_optimization_job(job_id: str) -> OptimizationJobOut:
+    job = optimizer_jobs.cancel(job_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No optimization job found with ID: {job_id}"
+        )
+    return to_optimization_job_out(job)
+
+
+@router.get("/cache-stats", response_model=MatrixCacheStats)
+async def web_service_read_matrix_cache_stats() -> MatrixCacheStats:
+    """
+    Distance/coverage matrix cache counters, summed over all optimizer workers.
+    """
+    return to_matrix_cache_stats(matrix_cache_counters)
\ No newline at end of file
@@ -1,7 +1,8 @@
 from app.model.orm import Incidence
 from app.data.incidence import (
     IncidenceCreate, IncidenceOut, IncidencesOut, IncidenceCreateOut,
-    IncidenceUpdate
+    IncidenceUpdate, IncidenceFilter, StatsBucket, TypeCount, TypeWeekCount,
+    WeekdayCount, HourCount, PeriodCount, HeatmapOut
 )
 from app.api.deps import (
     CurrentUser, SessionDep, get_current_active_superuser, get_current_user
@@ -13,17 +14,23 @@ from app.data.incidence_type import validate_incidence_type_exists
 from app.data.citizen import validate_citizen_exists
 from app.data.incidence import (
     create_incidence, get_incidences, get_incidence_by_id, delete_incidence_by_id,
-    update_incidence, update_incidence_availability
+    update_incidence, update_incidence_availability, get_incidence_counts_by_type,
+    get_incidence_counts_by_type_and_week, get_incidence_counts_by_weekday,
+    get_incidence_counts_by_hour, get_incidence_counts_by_period, get_incidence_heatmap,
+    get_incidence_extent, KM_PER_DEGREE
 ) 
 
 
-from typing import Optional  
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Annotated, List, Literal, Optional  
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from pydantic import ValidationError
 from sqlalchemy.exc import SQLAlchemyError, IntegrityError
 
 router = APIRouter()
 
+# Upper bound on the cells a heatmap bounding box may span at the requested resolution
+MAX_HEATMAP_CELLS = 40_000
+
 
 @router.get(
     "/",
@@ -31,10 +38,14 @@ router = APIRouter()
     response_model=IncidencesOut,
 )
 async def web_service_read_incidences(
-        *, session: SessionDep, skip: int = 0, limit: int = 100
+        *, session: SessionDep, skip: int = 0, limit: int = 100, cursor: Optional[str] = None,
+        filters: Annotated[IncidenceFilter, Depends()]
     ) -> Optional[IncidencesOut]:
     """
-    Retrieve Incidence Types.
+    Retrieve Incidences, newest first, filtered in SQL by incident date range,
+    type, status, citizen, user, active flag (active only by default) and a
+    latitude/longitude bounding box. Pass the returned next_cursor as cursor
+    to fetch the following page; skip is ignored when a cursor is given.
     """
     try:
         if skip < 0:
@@ -47,7 +58,14 @@ async def web_service_read_incidences(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="The limit parameter must be greater than 0.",
             )
-        incidences_out: IncidencesOut = await get_incidences(session=session, skip=skip, limit=limit)
+        if filters.date_from and filters.date_to and filters.date_from > filters.date_to:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="The date_from parameter must be before date_to.",
+            )
+        incidences_out: IncidencesOut = await get_incidences(
+            session=session, skip=skip, limit=limit, cursor=cursor, filters=filters
+        )
         if not incidences_out:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -57,6 +75,12 @@ async def web_service_read_incidences(
     
     except HTTPException as e:
         raise e
+
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="The cursor parameter is not valid.",
+        )
     
     except Exception as e:
         raise HTTPException(
@@ -64,6 +88,127 @@ async def web_service_read_incidences(
             detail="An unexpected error occurred while the incidents were being searched",
         )
 
+async def _read_incidence_stats(fetch, session, filters: IncidenceFilter, **options):
+    try:
+        if filters.date_from and filters.date_to and filters.date_from > filters.date_to:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="The date_from parameter must be before date_to.",
+            )
+        return await fetch(session=session, filters=filters, **options)
+
+    except HTTPException as e:
+        raise e
+
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="An unexpected error occurred while the incidence statistics were being computed",
+        )
+
+
+@router.get("/stats/by-type", dependencies=[Depends(get_current_user)], response_model=List[TypeCount])
+async def web_service_incidence_stats_by_type(
+        *, session: SessionDep, filters: Annotated[IncidenceFilter, Depends()]
+    ) -> List[TypeCount]:
+    """
+    Number of incidences per type, most frequent first. Accepts the list filters.
+    """
+    return await _read_incidence_stats(get_incidence_counts_by_type, session, filters)
+
+
+@router.get("/stats/by-type-week", dependencies=[Depends(get_current_user)], response_model=List[TypeWeekCount])
+async def web_service_incidence_stats_by_type_and_week(
+        *, session: SessionDep, filters: Annotated[IncidenceFilter, Depends()]
+    ) -> List[TypeWeekCount]:
+    """
+    Number of incidences per type and ISO week of date_incident.
+    """
+    return await _read_incidence_stats(get_incidence_counts_by_type_and_week, session, filters)
+
+
+@router.get("/stats/by-weekday", dependencies=[Depends(get_current_user)], response_model=List[WeekdayCount])
+async def web_service_incidence_stats_by_weekday(
+        *, session: SessionDep, filters: Annotated[IncidenceFilter, Depends()]
+    ) -> List[WeekdayCount]:
+    """
+    Number of incidences per ISO weekday (1 = Monday) of date_incident.
+    """
+    return await _read_incidence_stats(get_incidence_counts_by_weekday, session, filters)
+
+
+@router.get("/stats/by-month", dependencies=[Depends(get_current_user)], response_model=List[PeriodCount])
+async def web_service_incidence_stats_by_month(
+        *, session: SessionDep, filters: Annotated[IncidenceFilter, Depends()]
+    ) -> List[PeriodCount]:
+    """
+    Number of incidences per calendar month (period is the first day of the month).
+    """
+    return await _read_incidence_stats(get_incidence_counts_by_period, session, filters, unit="month")
+
+
+@router.get("/stats/by-hour", dependencies=[Depends(get_current_user)], response_model=List[HourCount])
+async def web_service_incidence_stats_by_hour(
+        *, session: SessionDep, filters: Annotated[IncidenceFilter, Depends()]
+    ) -> List[HourCount]:
+    """
+    Number of incidences per hour of day of time_incident.
+    """
+    return await _read_incidence_stats(get_incidence_counts_by_hour, session, filters)
+
+
+@router.get("/stats/time-series", dependencies=[Depends(get_current_user)], response_model=List[PeriodCount])
+async def web_service_incidence_stats_time_series(
+        *, session: SessionDep, filters: Annotated[IncidenceFilter, Depends()], unit: StatsBucket = "week"
+    ) -> List[PeriodCount]:
+    """
+    Number of incidences per day, week (starting on Monday), month, quarter or
+    year of date_incident, like date_trunc.
+    """
+    return await _read_incidence_stats(get_incidence_counts_by_period, session, filters, unit=unit)
+
+
+async def _get_bounded_heatmap(*, session, filters: IncidenceFilter, cell_size: float, shape: str) -> HeatmapOut:
+    # Bounds missing from the bounding box are taken from the extent of the
+    # matching incidences, so an open box is limited the same way
+    bounds = (filters.min_latitude, filters.max_latitude, filters.min_longitude, filters.max_longitude)
+    for minimum, maximum in (bounds[:2], bounds[2:]):
+        if minimum is not None and maximum is not None and minimum > maximum:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="The bounding box minimums must not exceed its maximums.",
+            )
+    if None in bounds:
+        extent = await get_incidence_extent(session=session, filters=filters)
+        if extent is not None:
+            bounds = tuple(given if given is not None else found for given, found in zip(bounds, extent))
+    if None not in bounds:
+        min_latitude, max_latitude, min_longitude, max_longitude = bounds
+        rows = (max_latitude - min_latitude) * KM_PER_DEGREE / cell_size
+        columns = (max_longitude - min_longitude) * KM_PER_DEGREE / cell_size
+        if (rows + 1) * (columns + 1) > MAX_HEATMAP_CELLS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="The bounding box spans too many cells; use a larger cell_size.",
+            )
+    return await get_incidence_heatmap(session=session, filters=filters, cell_size=cell_size, shape=shape)
+
+
+@router.get("/heatmap", dependencies=[Depends(get_current_user)], response_model=HeatmapOut)
+async def web_service_incidence_heatmap(
+        *, session: SessionDep, filters: Annotated[IncidenceFilter, Depends()],
+        cell_size: Annotated[float, Query(gt=0.01, le=100)] = 0.5,
+        shape: Literal["square", "hex"] = "square"
+    ) -> HeatmapOut:
+    """
+    Incidence density binned into square or hexagonal cells of cell_size km
+    inside the filter's bounding box: one centroid and count per non-empty cell.
+    Returns 400 if the box, completed with the extent of the matching incidences
+    where it is open, spans more than MAX_HEATMAP_CELLS cells.
+    """
+    return await _read_incidence_stats(_get_bounded_heatmap, session, filters, cell_size=cell_size, shape=shape)
+
+
 @router.get("/{incidence_id}", dependencies=[Depends(get_current_user)], response_model=IncidenceOut)
 async def web_service_read_incidence_by_id(
        incidence_id: int ,session: SessionDep
@@ -52,6 +52,17 @@ class Settings(BaseSettings):
     EMAILS_FROM_EMAIL: Optional[str] = None
     EMAILS_FROM_NAME: Optional[str] = None
 
+    # Optimizer
+    OPTIMIZER_MAX_WORKERS: int = config("OPTIMIZER_MAX_WORKERS", default=2, cast=int)
+    OPTIMIZER_MAX_QUEUED_JOBS: int = config("OPTIMIZER_MAX_QUEUED_JOBS", default=16, cast=int)
+    OPTIMIZER_JOB_TTL_SECONDS: int = 60 * 60
+    OPTIMIZER_MULTISTART_WORKERS: int = config("OPTIMIZER_MULTISTART_WORKERS", default=4, cast=int)
+    OPTIMIZER_RESULT_TTL_SECONDS: int = config("OPTIMIZER_RESULT_TTL_SECONDS", default=60 * 60 * 24, cast=int)
+
+    # List endpoints
+    COUNT_CACHE_TTL_SECONDS: int = config("COUNT_CACHE_TTL_SECONDS", default=60, cast=int)
+    HEATMAP_CACHE_TTL_SECONDS: int = config("HEATMAP_CACHE_TTL_SECONDS", default=300, cast=int)
+
 
     # class Config:
     #     case_sensitive = True
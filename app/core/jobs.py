@@ -0,0 +1,191 @@
+import asyncio
+import multiprocessing
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional
+
+from app.core.config import settings
+from scripts.optimizers.cache import create_shared_counters, install_shared_counters
+from scripts.optimizers.shared import cleanup_stale_segments
+
+
+class JobQueueFullError(Exception):
+    pass
+
+
+@dataclass
+class Job:
+    id: str
+    future: Future
+    submittedAt: float = field(default_factory=time.time)
+    finishedAt: Optional[float] = None
+    cancel_requested: bool = False
+    stop_event: Any = None
+
+    @property
+    def status(self) -> str:
+        if self.future.cancelled() or (self.cancel_requested and self.future.done()):
+            return "cancelled"
+        if self.future.done():
+            return "failed" if self.future.exception() is not None else "completed"
+        if self.cancel_requested:
+            return "cancelling"
+        return "running" if self.future.running() else "pending"
+
+    @property
+    def result(self) -> Any:
+        if self.status != "completed":
+            return None
+        return self.future.result()
+
+    @property
+    def error(self) -> Optional[str]:
+        if self.status != "failed":
+            return None
+        return str(self.future.exception())
+
+
+class JobManager:
+    """
+    Runs CPU-bound work in a bounded process pool so it never blocks the event loop.
+
+    `max_workers` caps the number of concurrent solves and `max_queued_jobs` caps
+    the jobs that are pending or running at once; finished jobs are kept for
+    `job_ttl_seconds` so clients can poll their result.
+    """
+
+    def __init__(self, max_workers: int, max_queued_jobs: int, job_ttl_seconds: int,
+                 initializer: Optional[Callable] = None, initargs: tuple = ()) -> None:
+        self.max_workers = max_workers
+        self.max_queued_jobs = max_queued_jobs
+        self.job_ttl_seconds = job_ttl_seconds
+        self.initializer = initializer
+        self.initargs = initargs
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._manager = None
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers, initializer=self.initializer, initargs=self.initargs
+            )
+        return self._executor
+
+    def _discard_executor(self, executor: ProcessPoolExecutor) -> None:
+        """
+        Drops a pool broken by a dead worker (OOM kill, crash) so the next submit
+        starts a fresh one. Jobs queued on it fail with BrokenProcessPool.
+        """
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    @property
+    def manager(self):
+        """
+        Shared multiprocessing manager: its Event/Queue proxies can be sent to workers.
+        """
+        if self._manager is None:
+            self._manager = multiprocessing.Manager()
+        return self._manager
+
+    def _active_jobs(self) -> int:
+        return sum(1 for job in self._jobs.values() if not job.future.done())
+
+    def _evict_expired(self) -> None:
+        now = time.time()
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.finishedAt is not None and now - job.finishedAt > self.job_ttl_seconds
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def submit(self, fn: Callable, *args, cancellable: bool = False, **kwargs) -> Job:
+        """
+        With `cancellable`, `fn` also receives a `stop_event` keyword argument that
+        is set when the job is cancelled, so a running job can stop cooperatively.
+        """
+        with self._lock:
+            self._evict_expired()
+            if self._active_jobs() >= self.max_queued_jobs:
+                raise JobQueueFullError("Too many optimization jobs in progress, try again later.")
+            stop_event = self.manager.Event() if cancellable else None
+            if cancellable:
+                kwargs["stop_event"] = stop_event
+            executor = self.executor
+            try:
+                future = executor.submit(fn, *args, **kwargs)
+            except BrokenProcessPool:
+                self._executor = None
+                executor.shutdown(wait=False, cancel_futures=True)
+                executor = self.executor
+                future = executor.submit(fn, *args, **kwargs)
+            job = Job(id=uuid.uuid4().hex, future=future, stop_event=stop_event)
+            self._jobs[job.id] = job
+
+        def mark_finished(done: Future) -> None:
+            job.finishedAt = time.time()
+            if not done.cancelled() and isinstance(done.exception(), BrokenProcessPool):
+                self._discard_executor(executor)
+
+        future.add_done_callback(mark_finished)
+        return job
+
+    async def run(self, fn: Callable, *args, **kwargs) -> Any:
+        """
+        Submit a job and wait for its result without blocking the event loop.
+        """
+        job = self.submit(fn, *args, **kwargs)
+        return await asyncio.wrap_future(job.future)
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            self._evict_expired()
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """
+        Pending jobs are removed from the queue. A running job is signalled through
+        its stop event when it was submitted as cancellable; otherwise it cannot be
+        interrupted and its result is discarded.
+        """
+        job = self.get(job_id)
+        if job is None:
+            return None
+        if not job.future.done():
+            job.future.cancel()
+            job.cancel_requested = True
+            if job.stop_event is not None:
+                job.stop_event.set()
+        return job
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        if self._manager is not None:
+            self._manager.shutdown()
+            self._manager = None
+        # Segments still held by workers that died without releasing them
+        cleanup_stale_segments()
+
+
+# Hits/misses of the distance and coverage matrix cache, summed over every worker
+matrix_cache_counters = create_shared_counters()
+
+optimizer_jobs = JobManager(
+    max_workers=settings.OPTIMIZER_MAX_WORKERS,
+    max_queued_jobs=settings.OPTIMIZER_MAX_QUEUED_JOBS,
+    job_ttl_seconds=settings.OPTIMIZER_JOB_TTL_SECONDS,
+    initializer=install_shared_counters,
+    initargs=(matrix_cache_counters,),
+)
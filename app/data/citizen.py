@@ -12,6 +12,7 @@ from datetime import datetime, timezone
 from sqlalchemy.sql import select, func
 from typing import Optional
 from sqlalchemy.sql import select
+from app.data.count import count_rows, CountMode
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import SQLAlchemyError, IntegrityError
 from fastapi import HTTPException, status
@@ -19,14 +20,12 @@ from fastapi import HTTPException, status
 
 
 async def get_citizens(
-        *, session: AsyncSession, skip: int = 0, limit: int = 100
+        *, session: AsyncSession, skip: int = 0, limit: int = 100,
+        count_mode: CountMode = "cached"
     ):
-    count_query = (
-        select(func.count()).select_from(Citizen).where(Citizen.is_active == True).offset(skip).limit(limit)
+    citizens_count = await count_rows(
+        session=session, model=Citizen, where=(Citizen.is_active == True,), mode=count_mode
     )
-    response = await session.scalar(count_query)
-
-    citizens_count = int(response)
     citizens_query = (
         select(Citizen).where(Citizen.is_active == True).offset(skip).limit(limit)
     )
@@ -0,0 +1,88 @@
+import json
+from app.core.config import settings
+from app.helpers.cache import TTLCache
+from typing import Literal
+from sqlalchemy import literal_column
+from sqlalchemy.sql import select, func, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# exact: count(*) on every call
+# cached: count(*) reused for COUNT_CACHE_TTL_SECONDS
+# estimate: planner statistics (PostgreSQL) or max(rowid) (SQLite)
+CountMode = Literal["exact", "cached", "estimate"]
+
+# Below this many rows an exact count is cheap and estimates are unreliable
+ESTIMATE_EXACT_THRESHOLD = 10_000
+
+_count_cache = TTLCache(ttl_seconds=settings.COUNT_CACHE_TTL_SECONDS)
+
+
+async def _exact_count(*, session: AsyncSession, query) -> int:
+    return int(await session.scalar(query) or 0)
+
+
+async def _cached_count(*, session: AsyncSession, query) -> int:
+    key = (
+        session.bind.dialect.name,
+        str(query.compile(dialect=session.bind.dialect, compile_kwargs={"literal_binds": True}))
+    )
+    count = _count_cache.get(key)
+    if count is None:
+        count = await _exact_count(session=session, query=query)
+        _count_cache.set(key, count)
+    return count
+
+
+async def _explain(*, session: AsyncSession, query):
+    """
+    EXPLAIN (FORMAT JSON) of `query` with its values sent as driver parameters:
+    neither inlined into the SQL nor re-parsed by text(), so any filter value
+    is safe.
+    """
+    compiled = query.compile(dialect=session.bind.dialect)
+    parameters = compiled.construct_params()
+    if compiled.positional:
+        parameters = tuple(parameters[name] for name in compiled.positiontup)
+    connection = await session.connection()
+    result = await connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}", parameters)
+    return result.scalar()
+
+
+async def _estimated_count(*, session: AsyncSession, model, where: tuple, query) -> int:
+    dialect = session.bind.dialect.name
+    estimate = None
+    if dialect == "postgresql":
+        if where:
+            # The planner's row estimate for the filtered scan (count(*) itself plans as one row)
+            scan = select(literal_column("1")).select_from(model).where(*where)
+            plan = await _explain(session=session, query=scan)
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            estimate = plan[0]["Plan"]["Plan Rows"]
+        else:
+            estimate = await session.scalar(
+                text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:table)"),
+                {"table": model.__tablename__}
+            )
+    elif dialect == "sqlite" and not where:
+        # Rows are rarely deleted physically, so the largest rowid tracks the table size
+        estimate = await session.scalar(select(func.max(literal_column("rowid"))).select_from(model))
+    # reltuples is -1 on tables that were never analyzed
+    if estimate is None or estimate < ESTIMATE_EXACT_THRESHOLD:
+        return await _cached_count(session=session, query=query)
+    return int(estimate)
+
+
+async def count_rows(
+        *, session: AsyncSession, model, where: tuple = (), mode: CountMode = "exact"
+    ) -> int:
+    """
+    Number of rows of `model` matching `where`, computed according to `mode`.
+    Pagination must never be applied to the count.
+    """
+    query = select(func.count()).select_from(model).where(*where)
+    if mode == "cached":
+        return await _cached_count(session=session, query=query)
+    if mode == "estimate":
+        return await _estimated_count(session=session, model=model, where=where, query=query)
+    return await _exact_count(session=session, query=query)
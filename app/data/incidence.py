@@ -1,20 +1,27 @@
-from app.model.orm import Incidence
+from app.model.orm import Incidence, IncidenceType
 from app.dto.incidence import (
     IncidenceCreate, IncidenceOut, IncidencesOut, IncidenceCreateOut,
-    IncidenceUpdate
+    IncidenceUpdate, IncidenceFilter, StatsBucket, TypeCount, TypeWeekCount,
+    WeekdayCount, HourCount, PeriodCount, HeatmapCell, HeatmapOut
 )
 from app.dto.utils import Message
 from app.helpers.convertions import make_naive
 from app.helpers.incidence import (
-    to_incidence_out, to_incidence_create_out
+    to_incidence_out, to_incidence_create_out, encode_incidence_cursor, decode_incidence_cursor
 )
-from sqlalchemy.sql import select, update, func
+from sqlalchemy.sql import select, update, func, cast, tuple_
 from sqlalchemy.orm import joinedload
-from typing import Optional
+from sqlalchemy import Integer, Date, literal_column
+from typing import List, Optional, Tuple
+import math
+import numpy as np
 from sqlalchemy.sql import select, delete
+from app.data.count import count_rows, CountMode
+from app.core.config import settings
+from app.helpers.cache import TTLCache
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import SQLAlchemyError
-from datetime import datetime, timezone
+from datetime import date, datetime, timezone
 from pydantic import ValidationError
 
 
@@ -73,33 +80,46 @@ async def get_incidence_by_id(
     
 
 async def get_incidences(
-        *, session: AsyncSession, skip: int = 0, limit: int = 100
+        *, session: AsyncSession, skip: int = 0, limit: int = 100,
+        count_mode: CountMode = "estimate", cursor: Optional[str] = None,
+        filters: Optional[IncidenceFilter] = None
     ) -> Optional[IncidencesOut]:
-    count_query = (
-        select(func.count())
-        .select_from(Incidence)
-        .where(Incidence.is_active == True)
-        .offset(skip)
-        .limit(limit)
+    """
+    Incidences matching `filters` (only active ones unless filters.is_active
+    says otherwise), newest first. With `cursor` (the `next_cursor` of a
+    previous page) the page starts right after that row using the
+    (is_active, createdAt, id) index, so deep pages cost the same as the first
+    one; `skip` is ignored in that case.
+    """
+    conditions = listed_incidence_conditions(filters)
+    incidence_count = await count_rows(
+        session=session, model=Incidence, where=tuple(conditions), mode=count_mode
     )
-    response = await session.scalar(count_query)
-    incidence_count = int(response)
     incidence_query = (
         select(Incidence)
-        .where(Incidence.is_active == True)
-        .offset(skip)
-        .limit(limit)
+        .where(*conditions)
+        .order_by(Incidence.createdAt.desc(), Incidence.id.desc())
+        .limit(limit + 1)
         .options(
             joinedload(Incidence.type),
             joinedload(Incidence.status),
             joinedload(Incidence.citizen)
         )
     )
+    if cursor is not None:
+        created_at, incidence_id = decode_incidence_cursor(cursor)
+        incidence_query = incidence_query.where(
+            tuple_(Incidence.createdAt, Incidence.id) < tuple_(created_at, incidence_id)
+        )
+    else:
+        incidence_query = incidence_query.offset(skip)
     incidences = (await session.scalars(incidence_query)).all()
+    # One extra row tells whether there is a next page
+    next_cursor = encode_incidence_cursor(incidences[limit - 1]) if len(incidences) > limit else None
     incidences_out: list[IncidencesOut] = [ 
-        to_incidence_out(incidence_in=incidence_data) for incidence_data in incidences
+        to_incidence_out(incidence_in=incidence_data) for incidence_data in incidences[:limit]
     ]
-    return IncidencesOut(data=incidences_out, count=incidence_count)
+    return IncidencesOut(data=incidences_out, count=incidence_count, next_cursor=next_cursor)
 
 
 async def validate_incidence_exists(
@@ -179,4 +199,316 @@ async def update_incidence_availability(
         return current_incidence
     except SQLAlchemyError as err:
         await session.rollback()
-        return None
\ No newline at end of file
+        return None
+
+
+# Kilometres per degree of latitude (mean Earth radius of 6371 km)
+KM_PER_DEGREE = 111.195
+
+# Hexagons are built from square micro-cells this many times smaller than the hexagon
+HEX_MICRO_CELLS_PER_CELL = 4
+
+_heatmap_cache = TTLCache(ttl_seconds=settings.HEATMAP_CACHE_TTL_SECONDS, max_entries=256)
+
+
+def incidence_filter_conditions(filters: Optional[IncidenceFilter]) -> list:
+    """
+    WHERE conditions for the fields set in an IncidenceFilter.
+    """
+    if filters is None:
+        return []
+    conditions = []
+    if filters.date_from is not None:
+        conditions.append(Incidence.date_incident >= filters.date_from)
+    if filters.date_to is not None:
+        conditions.append(Incidence.date_incident <= filters.date_to)
+    if filters.type_id is not None:
+        conditions.append(Incidence.type_id == filters.type_id)
+    if filters.status_id is not None:
+        conditions.append(Incidence.status_id == filters.status_id)
+    if filters.citizen_id is not None:
+        conditions.append(Incidence.citizen_id == filters.citizen_id)
+    if filters.user_id is not None:
+        conditions.append(Incidence.user_id == filters.user_id)
+    if filters.is_active is not None:
+        conditions.append(Incidence.is_active == filters.is_active)
+    if filters.min_latitude is not None:
+        conditions.append(Incidence.latitude >= filters.min_latitude)
+    if filters.max_latitude is not None:
+        conditions.append(Incidence.latitude <= filters.max_latitude)
+    if filters.min_longitude is not None:
+        conditions.append(Incidence.longitude >= filters.min_longitude)
+    if filters.max_longitude is not None:
+        conditions.append(Incidence.longitude <= filters.max_longitude)
+    return conditions
+
+
+def listed_incidence_conditions(filters: Optional[IncidenceFilter]) -> list:
+    """
+    Filter conditions of the list and stats endpoints: only active incidences
+    unless filters.is_active is set.
+    """
+    conditions = incidence_filter_conditions(filters)
+    if filters is None or filters.is_active is None:
+        conditions.append(Incidence.is_active == True)
+    return conditions
+
+
+def located_incidence_conditions(filters: Optional[IncidenceFilter]) -> list:
+    """
+    listed_incidence_conditions restricted to incidences with coordinates.
+    """
+    return listed_incidence_conditions(filters) + [
+        Incidence.latitude.isnot(None), Incidence.longitude.isnot(None)
+    ]
+
+
+async def get_incidence_extent(
+        *, session: AsyncSession, filters: Optional[IncidenceFilter] = None
+    ) -> Optional[Tuple[float, float, float, float]]:
+    """
+    (min_latitude, max_latitude, min_longitude, max_longitude) of the located
+    incidences matching `filters`, or None if there are none.
+    """
+    query = select(
+        func.min(Incidence.latitude), func.max(Incidence.latitude),
+        func.min(Incidence.longitude), func.max(Incidence.longitude)
+    ).where(*located_incidence_conditions(filters))
+    extent = (await session.execute(query)).one()
+    if extent[0] is None:
+        return None
+    return tuple(float(value) for value in extent)
+
+
+def sql_floor(session: AsyncSession, expression, lower_bound: float):
+    """
+    floor() that also works on SQLite builds without math functions: there the
+    value is shifted to be positive and truncated with CAST. `lower_bound` must
+    be a lower bound of `expression`.
+    """
+    if session.bind.dialect.name == "sqlite":
+        offset = math.ceil(abs(lower_bound)) + 1
+        return cast(expression + offset, Integer) - offset
+    return func.floor(expression)
+
+
+async def get_incidence_demand_cells(
+        *, session: AsyncSession, filters: Optional[IncidenceFilter] = None, cell_size: float = 0.5
+    ) -> List[Tuple[float, float, int]]:
+    """
+    Aggregates located incidences matching `filters` (only active ones unless
+    filters.is_active says otherwise, as in the list) into square cells of
+    `cell_size` km.
+
+    Returns one (latitude, longitude, count) tuple per non-empty cell, where the
+    coordinates are the centroid of the incidences in the cell.
+    """
+    located = located_incidence_conditions(filters)
+    if filters is not None and filters.min_latitude is not None and filters.max_latitude is not None:
+        reference_latitude = (filters.min_latitude + filters.max_latitude) / 2
+    else:
+        reference_query = select(func.avg(Incidence.latitude)).where(*located)
+        reference_latitude = await session.scalar(reference_query)
+        if reference_latitude is None:
+            return []
+    cell_latitude = cell_size / KM_PER_DEGREE
+    cell_longitude = cell_latitude / max(math.cos(math.radians(reference_latitude)), 1e-6)
+
+    cell_y = sql_floor(session, Incidence.latitude / cell_latitude, -90 / cell_latitude).label("cell_y")
+    cell_x = sql_floor(session, Incidence.longitude / cell_longitude, -180 / cell_longitude).label("cell_x")
+    query = (
+        select(
+            func.avg(Incidence.latitude),
+            func.avg(Incidence.longitude),
+            func.count(Incidence.id),
+        )
+        .where(*located)
+        .group_by(cell_y, cell_x)
+    )
+    result = await session.execute(query)
+    return [(float(latitude), float(longitude), int(count)) for latitude, longitude, count in result.all()]
+
+
+def incidence_date_bucket(session: AsyncSession, unit: StatsBucket):
+    """
+    First day of the `unit` period containing date_incident (weeks start on
+    Monday): date_trunc on PostgreSQL, date()/strftime() on SQLite.
+    """
+    if session.bind.dialect.name == "sqlite":
+        if unit == "day":
+            return func.date(Incidence.date_incident)
+        if unit == "week":
+            # 'weekday 0' moves forward to Sunday; six days back is that week's Monday
+            return func.date(Incidence.date_incident, "weekday 0", "-6 days")
+        if unit == "month":
+            return func.strftime("%Y-%m-01", Incidence.date_incident)
+        if unit == "quarter":
+            month = cast(func.strftime("%m", Incidence.date_incident), Integer)
+            return func.printf(
+                "%s-%02d-01", func.strftime("%Y", Incidence.date_incident), (month - 1) // 3 * 3 + 1
+            )
+        return func.strftime("%Y-01-01", Incidence.date_incident)
+    # The unit is inlined so the SELECT and GROUP BY expressions are identical
+    return cast(func.date_trunc(literal_column(f"'{unit}'"), Incidence.date_incident), Date)
+
+
+def _as_date(value) -> date:
+    # SQLite returns the bucket as an ISO string
+    return date.fromisoformat(value) if isinstance(value, str) else value
+
+
+async def get_incidence_counts_by_type(
+        *, session: AsyncSession, filters: Optional[IncidenceFilter] = None
+    ) -> List[TypeCount]:
+    query = (
+        select(IncidenceType.id, IncidenceType.name, func.count(Incidence.id))
+        .join(IncidenceType, Incidence.type_id == IncidenceType.id)
+        .where(*listed_incidence_conditions(filters))
+        .group_by(IncidenceType.id, IncidenceType.name)
+        .order_by(func.count(Incidence.id).desc())
+    )
+    result = await session.execute(query)
+    return [TypeCount(type_id=type_id, type_name=name, count=count) for type_id, name, count in result.all()]
+
+
+async def get_incidence_counts_by_type_and_week(
+        *, session: AsyncSession, filters: Optional[IncidenceFilter] = None
+    ) -> List[TypeWeekCount]:
+    week_start = incidence_date_bucket(session, "week").label("week_start")
+    query = (
+        select(IncidenceType.id, IncidenceType.name, week_start, func.count(Incidence.id))
+        .join(IncidenceType, Incidence.type_id == IncidenceType.id)
+        .where(*listed_incidence_conditions(filters))
+        .group_by(IncidenceType.id, IncidenceType.name, week_start)
+        .order_by(week_start, IncidenceType.id)
+    )
+    result = await session.execute(query)
+    counts = []
+    for type_id, name, start, count in result.all():
+        start = _as_date(start)
+        iso_year, iso_week, _ = start.isocalendar()
+        counts.append(TypeWeekCount(
+            type_id=type_id, type_name=name, week_start=start,
+            iso_year=iso_year, iso_week=iso_week, count=count
+        ))
+    return counts
+
+
+async def get_incidence_counts_by_weekday(
+        *, session: AsyncSession, filters: Optional[IncidenceFilter] = None
+    ) -> List[WeekdayCount]:
+    if session.bind.dialect.name == "sqlite":
+        # %w is 0 for Sunday: shifted to ISO numbering (Monday = 1 ... Sunday = 7)
+        weekday = (cast(func.strftime("%w", Incidence.date_incident), Integer) + 6) % 7 + 1
+    else:
+        weekday = cast(func.extract("isodow", Incidence.date_incident), Integer)
+    weekday = weekday.label("weekday")
+    query = (
+        select(weekday, func.count(Incidence.id))
+        .where(*listed_incidence_conditions(filters))
+        .group_by(weekday)
+        .order_by(weekday)
+    )
+    result = await session.execute(query)
+    return [WeekdayCount(weekday=day, count=count) for day, count in result.all()]
+
+
+async def get_incidence_counts_by_hour(
+        *, session: AsyncSession, filters: Optional[IncidenceFilter] = None
+    ) -> List[HourCount]:
+    if session.bind.dialect.name == "sqlite":
+        hour = cast(func.strftime("%H", Incidence.time_incident), Integer)
+    else:
+        hour = cast(func.extract("hour", Incidence.time_incident), Integer)
+    hour = hour.label("hour")
+    query = (
+        select(hour, func.count(Incidence.id))
+        .where(*listed_incidence_conditions(filters))
+        .group_by(hour)
+        .order_by(hour)
+    )
+    result = await session.execute(query)
+    return [HourCount(hour=value, count=count) for value, count in result.all()]
+
+
+async def get_incidence_counts_by_period(
+        *, session: AsyncSession, filters: Optional[IncidenceFilter] = None, unit: StatsBucket = "month"
+    ) -> List[PeriodCount]:
+    period = incidence_date_bucket(session, unit).label("period")
+    query = (
+        select(period, func.count(Incidence.id))
+        .where(*listed_incidence_conditions(filters))
+        .group_by(period)
+        .order_by(period)
+    )
+    result = await session.execute(query)
+    return [PeriodCount(period=_as_date(value), count=count) for value, count in result.all()]
+
+
+def _hex_cells(cells: List[Tuple[float, float, int]], cell_size: float) -> List[Tuple[float, float, int]]:
+    """
+    Merges (latitude, longitude, count) micro-cells into pointy-top hexagons
+    whose neighbouring centres are `cell_size` km apart. Returns the centroid
+    and count of each non-empty hexagon.
+    """
+    latitudes, longitudes, counts = (np.asarray(column, dtype=np.float64) for column in zip(*cells))
+    reference_latitude = np.average(latitudes, weights=counts)
+    y = latitudes * KM_PER_DEGREE
+    x = longitudes * KM_PER_DEGREE * math.cos(math.radians(reference_latitude))
+
+    # Axial coordinates, rounded to the nearest hexagon in cube coordinates
+    radius = cell_size / math.sqrt(3)
+    q = (math.sqrt(3) / 3 * x - y / 3) / radius
+    r = (2 / 3 * y) / radius
+    s = -q - r
+    rq, rr, rs = np.round(q), np.round(r), np.round(s)
+    dq, dr, ds = np.abs(rq - q), np.abs(rr - r), np.abs(rs - s)
+    fix_q = (dq > dr) & (dq > ds)
+    fix_r = ~fix_q & (dr > ds)
+    rq = np.where(fix_q, -rr - rs, rq)
+    rr = np.where(fix_r, -rq - rs, rr)
+
+    _, hexagon = np.unique(np.column_stack([rq, rr]), axis=0, return_inverse=True)
+    hexagon = hexagon.ravel()
+    totals = np.bincount(hexagon, weights=counts)
+    centroid_latitudes = np.bincount(hexagon, weights=counts * latitudes) / totals
+    centroid_longitudes = np.bincount(hexagon, weights=counts * longitudes) / totals
+    return [
+        (float(latitude), float(longitude), int(round(count)))
+        for latitude, longitude, count in zip(centroid_latitudes, centroid_longitudes, totals)
+    ]
+
+
+async def get_incidence_heatmap(
+        *, session: AsyncSession, filters: Optional[IncidenceFilter] = None,
+        cell_size: float = 0.5, shape: str = "square"
+    ) -> HeatmapOut:
+    """
+    Located incidences binned into square or hexagonal cells of `cell_size` km.
+    Square cells are aggregated in SQL; hexagons are merged in NumPy from SQL
+    micro-cells, so only one row per micro-cell leaves the database. Results
+    are cached per (shape, cell_size, filters) for HEATMAP_CACHE_TTL_SECONDS.
+    """
+    key = (
+        session.bind.dialect.name, shape, cell_size,
+        filters.model_dump_json() if filters is not None else None
+    )
+    heatmap = _heatmap_cache.get(key)
+    if heatmap is not None:
+        return heatmap
+
+    if shape == "hex":
+        cells = await get_incidence_demand_cells(
+            session=session, filters=filters, cell_size=cell_size / HEX_MICRO_CELLS_PER_CELL
+        )
+        cells = _hex_cells(cells, cell_size) if cells else []
+    else:
+        cells = await get_incidence_demand_cells(session=session, filters=filters, cell_size=cell_size)
+    heatmap = HeatmapOut(
+        shape=shape,
+        cell_size=cell_size,
+        total=sum(count for _, _, count in cells),
+        cells=[HeatmapCell(latitude=latitude, longitude=longitude, count=count) for latitude, longitude, count in cells]
+    )
+    _heatmap_cache.set(key, heatmap)
+    return heatmap
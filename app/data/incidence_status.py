@@ -12,6 +12,7 @@ from app.helpers.incidence_status import (
 from sqlalchemy.sql import select, update, func
 from typing import Optional
 from sqlalchemy.sql import select, delete
+from app.data.count import count_rows, CountMode
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import SQLAlchemyError
 from datetime import datetime, timezone
@@ -32,17 +33,12 @@ async def get_incidence_status_by_name(
         return None 
     
 async def get_incidences_status(
-        *, session: AsyncSession, skip: int = 0, limit: int = 100
+        *, session: AsyncSession, skip: int = 0, limit: int = 100,
+        count_mode: CountMode = "exact"
     ) -> Optional[ListStatusOut]:
-    count_query = (
-        select(func.count())
-        .select_from(IncidenceStatus)
-        .where(IncidenceStatus.is_active == True)
-        .offset(skip)
-        .limit(limit)
+    count = await count_rows(
+        session=session, model=IncidenceStatus, where=(IncidenceStatus.is_active == True,), mode=count_mode
     )
-    response = await session.scalar(count_query)
-    count = int(response)
     status_query = (
         select(IncidenceStatus).where(IncidenceStatus.is_active == True).offset(skip).limit(limit)
     )
@@ -11,22 +11,18 @@ from app.helpers.incidence_type import (
 from sqlalchemy.sql import select, update, func
 from typing import Optional
 from sqlalchemy.sql import select, delete
+from app.data.count import count_rows, CountMode
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import SQLAlchemyError
 from datetime import datetime, timezone
 
 async def get_incidences_type(
-        *, session: AsyncSession, skip: int = 0, limit: int = 100
+        *, session: AsyncSession, skip: int = 0, limit: int = 100,
+        count_mode: CountMode = "exact"
     ) -> Optional[IncidenceTypesOut]:
-    count_query = (
-        select(func.count())
-        .select_from(IncidenceType)
-        .where(IncidenceType.is_active == True)
-        .offset(skip)
-        .limit(limit)
+    type_count = await count_rows(
+        session=session, model=IncidenceType, where=(IncidenceType.is_active == True,), mode=count_mode
     )
-    response = await session.scalar(count_query)
-    type_count = int(response)
     type_query = (
         select(IncidenceType).where(IncidenceType.is_active == True).offset(skip).limit(limit)
     )
@@ -0,0 +1,59 @@
+from app.model.orm import OptimizationResultRecord
+from app.helpers.convertions import make_naive
+from typing import Optional
+from sqlalchemy.sql import select, delete
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import SQLAlchemyError
+from datetime import datetime, timedelta, timezone
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+async def get_optimization_result(
+        *, session: AsyncSession, request_hash: str
+    ) -> Optional[dict]:
+    """
+    Stored result for a request hash, or None. The store is best-effort: a
+    database error (e.g. the table has not been created) is logged and
+    treated as a miss.
+    """
+    now = make_naive(datetime.now(timezone.utc))
+    query = (
+        select(OptimizationResultRecord.result)
+        .where(OptimizationResultRecord.request_hash == request_hash)
+        .where(OptimizationResultRecord.expiresAt > now)
+    )
+    try:
+        return await session.scalar(query)
+    except SQLAlchemyError as err:
+        await session.rollback()
+        logger.warning("Could not read stored optimization result %s: %s", request_hash, err)
+        return None
+
+
+async def save_optimization_result(
+        *, session: AsyncSession, request_hash: str, result: dict, ttl_seconds: int
+    ) -> bool:
+    """
+    Store (or refresh) the result for a request hash and purge expired rows.
+    Returns False, after logging, if the database rejected the write.
+    """
+    now = make_naive(datetime.now(timezone.utc))
+    try:
+        await session.execute(
+            delete(OptimizationResultRecord).where(OptimizationResultRecord.expiresAt <= now)
+        )
+        await session.merge(OptimizationResultRecord(
+            request_hash= request_hash,
+            result= result,
+            createdAt= now,
+            expiresAt= now + timedelta(seconds=ttl_seconds)
+        ))
+        await session.commit()
+        return True
+    except SQLAlchemyError as err:
+        await session.rollback()
+        logger.warning("Could not store optimization result %s: %s", request_hash, err)
+        return False
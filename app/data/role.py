@@ -9,6 +9,7 @@ from datetime import date
 from sqlalchemy.sql import select, update, func
 from typing import Any, Optional
 from sqlalchemy.sql import select
+from app.data.count import count_rows, CountMode
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import SQLAlchemyError
 
@@ -17,14 +18,12 @@ from sqlalchemy.exc import SQLAlchemyError
 
 
 async def get_roles(
-        *, session: AsyncSession, skip: int = 0, limit: int = 100
+        *, session: AsyncSession, skip: int = 0, limit: int = 100,
+        count_mode: CountMode = "exact"
     ):
-    count_query = (
-        select(func.count()).select_from(Role).where(Role.is_active == True).offset(skip).limit(limit)
+    role_count = await count_rows(
+        session=session, model=Role, where=(Role.is_active == True,), mode=count_mode
     )
-    response = await session.scalar(count_query)
-
-    role_count = int(response)
     roles_query = (
         select(Role).where(Role.is_active == True).offset(skip).limit(limit)
     )
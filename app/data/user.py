@@ -13,6 +13,7 @@ from sqlalchemy.sql import select
 from datetime import datetime, timezone
 from datetime import date
 from sqlalchemy.sql import select, func
+from app.data.count import count_rows, CountMode
 from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import ValidationError
 from sqlalchemy.exc import SQLAlchemyError, IntegrityError
@@ -25,13 +26,12 @@ logger = logging.getLogger(__name__)
 
 
 async def get_users(
-        *, session: AsyncSession, skip: int = 0, limit: int = 100
+        *, session: AsyncSession, skip: int = 0, limit: int = 100,
+        count_mode: CountMode = "cached"
     ) -> Optional[UserPublic]:
-    count_query = (
-        select(func.count()).select_from(User).offset(skip).limit(limit)
+    user_count = await count_rows(
+        session=session, model=User, mode=count_mode
     )
-    response = await session.scalar(count_query)
-    user_count = int(response)
     users_query = (
         select(User).offset(skip).limit(limit)
     )
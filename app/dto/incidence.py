@@ -1,4 +1,4 @@
-from typing import Optional, List
+from typing import Optional, List, Literal
 from pydantic import BaseModel, Field, EmailStr 
 from datetime import datetime
 from datetime import date, time
@@ -63,6 +63,7 @@ class IncidenceOut(BaseModel):
 class IncidencesOut(BaseModel):
     data: List[IncidenceOut]
     count: int
+    next_cursor: Optional[str] = None
 
 
 class IncidenceCreateOut(BaseModel):
@@ -97,3 +98,57 @@ class IncidenceUpdate(BaseModel):
     time_incident:  Optional[time] = None 
     inciden_details:    Optional[str] = None 
     is_active: Optional[bool] = None
+
+
+class IncidenceFilter(BaseModel):
+    date_from: Optional[date] = None
+    date_to: Optional[date] = None
+    type_id: Optional[int] = None
+    status_id: Optional[int] = None
+    citizen_id: Optional[str] = None
+    user_id: Optional[str] = None
+    is_active: Optional[bool] = None
+    min_latitude: Optional[float] = Field(default=None, ge=-90, le=90)
+    max_latitude: Optional[float] = Field(default=None, ge=-90, le=90)
+    min_longitude: Optional[float] = Field(default=None, ge=-180, le=180)
+    max_longitude: Optional[float] = Field(default=None, ge=-180, le=180)
+
+
+StatsBucket = Literal["day", "week", "month", "quarter", "year"]
+
+class TypeCount(BaseModel):
+    type_id: int
+    type_name: str
+    count: int
+
+class TypeWeekCount(BaseModel):
+    type_id: int
+    type_name: str
+    week_start: date
+    iso_year: int
+    iso_week: int
+    count: int
+
+class WeekdayCount(BaseModel):
+    weekday: int = Field(ge=1, le=7, description="ISO weekday, 1 = Monday")
+    count: int
+
+class HourCount(BaseModel):
+    hour: int = Field(ge=0, le=23)
+    count: int
+
+class PeriodCount(BaseModel):
+    period: date
+    count: int
+
+
+class HeatmapCell(BaseModel):
+    latitude: float
+    longitude: float
+    count: int
+
+class HeatmapOut(BaseModel):
+    shape: Literal["square", "hex"]
+    cell_size: float
+    total: int
+    cells: List[HeatmapCell]
@@ -1,15 +1,121 @@
-from pydantic import BaseModel
-from typing import List, Tuple
+from pydantic import BaseModel, Field
+from typing import List, Literal, Optional, Tuple
+from datetime import datetime
+from app.dto.incidence import IncidenceFilter
 
-class OptimizationRequest(BaseModel):
+class SolverOptions(BaseModel):
+    max_facilities: int
+    coverage_radius: float
+    method: Literal["bbo", "pso", "greedy"] = "bbo"
+    coverage_format: Literal["auto", "dense", "sparse", "bitset"] = "auto"
+    time_budget: Optional[float] = Field(default=None, gt=0)
+    patience: Optional[int] = Field(default=None, ge=1)
+    seed: Optional[int] = None
+    n_starts: int = Field(default=1, ge=1, le=64)
+    num_candidates: Optional[int] = Field(
+        default=None, ge=1, description="Candidates proposed by k-means when facilities is omitted"
+    )
+
+class OptimizationRequest(SolverOptions):
+    points: List[Tuple[float, float]]
+    demands: List[float]
+    facilities: Optional[List[int]] = None
+
+class IncidenceOptimizationRequest(SolverOptions):
+    filters: IncidenceFilter = IncidenceFilter()
+    cell_size: float = Field(default=0.5, gt=0, description="Demand grid cell side in km")
+
+class SweepRequest(BaseModel):
+    points: List[Tuple[float, float]]
+    demands: List[float]
+    facilities: Optional[List[int]] = None
+    num_candidates: Optional[int] = Field(default=None, ge=1)
+    coverage_radii: List[float] = Field(min_length=1, max_length=64)
+    max_facilities: List[int] = Field(min_length=1, max_length=64)
+    method: Literal["bbo", "pso", "greedy"] = "greedy"
+    coverage_format: Literal["auto", "dense", "sparse", "bitset"] = "auto"
+    time_budget: Optional[float] = Field(default=None, gt=0)
+    patience: Optional[int] = Field(default=None, ge=1)
+    seed: Optional[int] = None
+
+class WhatIfRequest(BaseModel):
     points: List[Tuple[float, float]]
     demands: List[float]
     facilities: List[int]
-    max_facilities: int
     coverage_radius: float
+    configurations: List[List[int]] = Field(min_length=1, max_length=1000)
+    coverage_format: Literal["auto", "dense", "sparse", "bitset"] = "auto"
+    top_uncovered: int = Field(default=10, ge=0, le=100)
+
+class OptimizationRunStats(BaseModel):
+    method: str
+    seed: int
+    Fitness: float
+    epochs_run: int
+    stop_reason: str
+    elapsed_seconds: float
 
 class OptimizationResult(BaseModel):
     id: int
     target: List[float]
     Fitness: float
-    solution: List[int]
\ No newline at end of file
+    solution: List[int]
+    epochs_run: int = 0
+    fitness_history: List[float] = []
+    stop_reason: Optional[Literal["max_epochs", "time_budget", "patience", "converged", "cancelled"]] = None
+    elapsed_seconds: Optional[float] = None
+    runs: List[OptimizationRunStats] = []
+    facilities: Optional[List[int]] = None
+    request_hash: Optional[str] = None
+    cached: bool = False
+
+class IncidenceOptimizationResult(OptimizationResult):
+    points: List[Tuple[float, float]]
+    demands: List[float]
+
+class SweepScenario(BaseModel):
+    coverage_radius: float
+    max_facilities: int
+    Fitness: float
+    covered_demand: float
+    coverage_ratio: float
+    solution: List[int]
+    stop_reason: Optional[str] = None
+    elapsed_seconds: float
+
+class SweepResult(BaseModel):
+    scenarios: List[SweepScenario]
+    facilities: Optional[List[int]] = None
+    elapsed_seconds: float
+
+class UncoveredHotspot(BaseModel):
+    point_index: int
+    latitude: float
+    longitude: float
+    demand: float
+
+class ConfigurationEvaluation(BaseModel):
+    index: int
+    facilities_opened: int
+    covered_demand: float
+    coverage_ratio: float
+    uncovered_hotspots: List[UncoveredHotspot]
+
+class WhatIfResult(BaseModel):
+    evaluations: List[ConfigurationEvaluation]
+
+class OptimizationJobOut(BaseModel):
+    job_id: str
+    status: Literal["pending", "running", "completed", "failed", "cancelling", "cancelled"]
+    submittedAt: datetime
+    finishedAt: Optional[datetime] = None
+    result: Optional[OptimizationResult] = None
+    error: Optional[str] = None
+
+class MatrixCacheStats(BaseModel):
+    hits: int
+    misses: int
+    evictions: int
+    shared_hits: int
+    hit_ratio: float
+    max_bytes_per_worker: int
\ No newline at end of file
@@ -1,3 +1,7 @@
+import base64
+import json
+from datetime import datetime
+from typing import Tuple
 from app.model.orm import Incidence, IncidenceType, IncidenceStatus, Citizen
 from app.dto.incidence import IncidenceOut, IncidenceTypeOut, IncidenceStatusOut, CitizenOut, IncidenceCreateOut
 
@@ -61,4 +65,23 @@ def to_incidence_out(incidence_in: Incidence) -> IncidenceOut:
         updatedAt=incidence_in.updatedAt,
         deletedAt=incidence_in.deletedAt
     )
-    return incidence
\ No newline at end of file
+    return incidence
+
+def encode_incidence_cursor(incidence_in: Incidence) -> str:
+    """
+    Opaque cursor pointing just after `incidence_in` in the (createdAt, id) order.
+    """
+    payload = json.dumps([incidence_in.createdAt.isoformat(), incidence_in.id])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_incidence_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    (createdAt, id) stored in a cursor; raises ValueError if it is malformed.
+    """
+    try:
+        payload = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, incidence_id = json.loads(payload)
+        return datetime.fromisoformat(created_at), int(incidence_id)
+    except (TypeError, ValueError, UnicodeDecodeError) as err:
+        raise ValueError("Invalid cursor.") from err
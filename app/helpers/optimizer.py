@@ -0,0 +1,123 @@
+import hashlib
+import json
+from datetime import datetime, timezone
+from app.core.config import settings
+from app.core.jobs import Job
+from app.dto.optimizer import (
+    SolverOptions, OptimizationRequest, OptimizationJobOut, MatrixCacheStats, SweepRequest,
+    WhatIfRequest
+)
+from app.helpers.convertions import make_naive
+from scripts.optimizers.cache import HITS, MISSES, EVICTIONS, SHARED_HITS, MATRIX_CACHE_MAX_BYTES
+
+
+def to_solver_options(request: SolverOptions) -> dict:
+    """
+    Keyword arguments for solve_covering_location other than the problem data.
+    """
+    return dict(
+        max_facilities= request.max_facilities,
+        coverage_radius= request.coverage_radius,
+        method= request.method,
+        coverage_format= request.coverage_format,
+        time_budget= request.time_budget,
+        patience= request.patience,
+        seed= request.seed,
+        n_starts= request.n_starts,
+        num_candidates= request.num_candidates,
+        n_workers= settings.OPTIMIZER_MULTISTART_WORKERS
+    )
+
+
+def to_solve_kwargs(request: OptimizationRequest) -> dict:
+    """
+    Keyword arguments for solve_covering_location from an OptimizationRequest.
+    """
+    return dict(
+        points= request.points,
+        demands= request.demands,
+        facilities= request.facilities,
+        **to_solver_options(request)
+    )
+
+
+def to_sweep_kwargs(request: SweepRequest) -> dict:
+    """
+    Keyword arguments for sweep_covering_location from a SweepRequest.
+    """
+    return dict(
+        points= request.points,
+        demands= request.demands,
+        facilities= request.facilities,
+        coverage_radii= request.coverage_radii,
+        max_facilities_values= request.max_facilities,
+        method= request.method,
+        coverage_format= request.coverage_format,
+        time_budget= request.time_budget,
+        patience= request.patience,
+        seed= request.seed,
+        num_candidates= request.num_candidates,
+        n_workers= settings.OPTIMIZER_MULTISTART_WORKERS
+    )
+
+
+def to_what_if_kwargs(request: WhatIfRequest) -> dict:
+    """
+    Keyword arguments for evaluate_configurations from a WhatIfRequest.
+    """
+    return dict(
+        points= request.points,
+        demands= request.demands,
+        facilities= request.facilities,
+        coverage_radius= request.coverage_radius,
+        configurations= request.configurations,
+        coverage_format= request.coverage_format,
+        top_uncovered= request.top_uncovered
+    )
+
+
+def optimization_request_hash(request: OptimizationRequest) -> str:
+    """
+    sha256 of the request body serialized with sorted keys, so equal requests
+    hash equally regardless of field order in the incoming JSON.
+    """
+    canonical = json.dumps(
+        request.model_dump(mode="json"), sort_keys=True, separators=(",", ":")
+    )
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def to_seeded_solve_kwargs(request: OptimizationRequest, request_hash: str) -> dict:
+    """
+    Like to_solve_kwargs, but an unseeded request gets a seed derived from its
+    hash so the solve is reproducible.
+    """
+    kwargs = to_solve_kwargs(request)
+    if kwargs["seed"] is None:
+        kwargs["seed"] = int(request_hash[:8], 16)
+    return kwargs
+
+
+def to_optimization_job_out(job: Job) -> OptimizationJobOut:
+    return OptimizationJobOut(
+        job_id= job.id,
+        status= job.status,
+        submittedAt= make_naive(datetime.fromtimestamp(job.submittedAt, timezone.utc)),
+        finishedAt= make_naive(datetime.fromtimestamp(job.finishedAt, timezone.utc)) if job.finishedAt else None,
+        result= job.result,
+        error= job.error
+    )
+
+
+def to_matrix_cache_stats(counters) -> MatrixCacheStats:
+    hits, misses = int(counters[HITS]), int(counters[MISSES])
+    shared_hits = int(counters[SHARED_HITS])
+    lookups = hits + shared_hits + misses
+    return MatrixCacheStats(
+        hits= hits,
+        misses= misses,
+        evictions= int(counters[EVICTIONS]),
+        shared_hits= shared_hits,
+        hit_ratio= (hits + shared_hits) / lookups if lookups else 0.0,
+        max_bytes_per_worker= MATRIX_CACHE_MAX_BYTES
+    )
\ No newline at end of file
@@ -2,7 +2,7 @@ import uuid
 from typing import List 
 from sqlalchemy import (
     Column, ForeignKey, Integer, String, Float, Text,
-    Boolean, DateTime, Date, Uuid, Time
+    Boolean, DateTime, Date, Uuid, Time, JSON, Index
 )
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -181,7 +181,10 @@ class Incidence(Base):
 
     # auditoria
     is_active = Column(Boolean, index=True, default=True)
-    createdAt = Column(DateTime, server_default= func.now())
+    # NOT NULL: the list is keyset-paginated on (createdAt, id). Existing databases:
+    #   UPDATE incidence SET "createdAt" = now() WHERE "createdAt" IS NULL;
+    #   ALTER TABLE incidence ALTER COLUMN "createdAt" SET NOT NULL;
+    createdAt = Column(DateTime, server_default= func.now(), nullable=False)
     updatedAt = Column(DateTime, nullable=True)
     deletedAt = Column(DateTime, nullable=True)
 
@@ -190,6 +193,57 @@ class Incidence(Base):
     user = relationship("User")
     citizen = relationship("Citizen")
 
+    # Created at startup if missing (see main.py). Equivalent DDL for PostgreSQL,
+    # CONCURRENTLY to avoid blocking writes on a large table:
+    #   CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_incidence_active_created_id ON incidence (is_active, "createdAt", id);
+    #   CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_incidence_type_active_created_id ON incidence (type_id, is_active, "createdAt", id);
+    #   CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_incidence_status_active_created_id ON incidence (status_id, is_active, "createdAt", id);
+    #   CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_incidence_citizen_created ON incidence (citizen_id, "createdAt", id);
+    #   CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_incidence_user_created ON incidence (user_id, "createdAt", id);
+    #   CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_incidence_active_date ON incidence (is_active, date_incident);
+    #   CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_incidence_lat_lon ON incidence (latitude, longitude);
+    __table_args__ = (
+        # Keyset pagination of the incidence list: WHERE is_active ORDER BY createdAt, id
+        Index("ix_incidence_active_created_id", "is_active", "createdAt", "id"),
+        # Filters of the incidence list: equality columns first, then the list order
+        # (createdAt, id) so a filtered page is read in order without a sort
+        Index("ix_incidence_type_active_created_id", "type_id", "is_active", "createdAt", "id"),
+        Index("ix_incidence_status_active_created_id", "status_id", "is_active", "createdAt", "id"),
+        Index("ix_incidence_citizen_created", "citizen_id", "createdAt", "id"),
+        Index("ix_incidence_user_created", "user_id", "createdAt", "id"),
+        # Incident date range filter (and the /stats date buckets)
+        Index("ix_incidence_active_date", "is_active", "date_incident"),
+        Index("ix_incidence_lat_lon", "latitude", "longitude"),
+    )
+
+
+class OptimizationResultRecord(Base):
+    """
+    Results of /optimize-covering-location by request hash. The table is created
+    at startup if missing (see main.py); equivalent DDL for PostgreSQL:
+
+        CREATE TABLE IF NOT EXISTS optimization_result (
+            request_hash VARCHAR(64) PRIMARY KEY,
+            result JSON NOT NULL,
+            "createdAt" TIMESTAMP NOT NULL DEFAULT now(),
+            "expiresAt" TIMESTAMP NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS "ix_optimization_result_expiresAt"
+            ON optimization_result ("expiresAt");
+
+    The store is a cache: if the table is unavailable, solves still run and
+    their results are simply not stored.
+    """
+
+    __tablename__ = "optimization_result"
+
+    # sha256 of the canonical OptimizationRequest body
+    request_hash = Column(String(64), primary_key=True)
+    result = Column(JSON, nullable=False)
+
+    createdAt = Column(DateTime, server_default= func.now(), nullable=False)
+    expiresAt = Column(DateTime, index=True, nullable=False)
+
 
 
 
@@ -2,9 +2,12 @@ import uvicorn
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from sqlalchemy import inspect
 
 from app.core.config import settings
 from app.core.db import engine, Base, async_session
+from app.model.orm import Incidence, OptimizationResultRecord
+from app.core.jobs import optimizer_jobs
 from app.api.master import api_router
 from app.data.user import init_db
 
@@ -31,15 +34,28 @@ app.add_middleware(
 
 app.include_router(api_router, prefix = settings.API_V1_STR)
 
+def create_incidence_indexes(connection) -> None:
+    # Indexes of the incidence list/filters, added after the table was created;
+    # skipped on a database without the table (create_all is not run here)
+    if inspect(connection).has_table(Incidence.__tablename__):
+        for index in Incidence.__table__.indexes:
+            index.create(connection, checkfirst=True)
+
 @app.on_event("startup")
 async def startup():
     # create db tables
     async with engine.begin() as conn:
         #await conn.run_sync(Base.metadata.drop_all)
         #await conn.run_sync(Base.metadata.create_all)
-        pass
+        # Optimizer result store: new table, safe to create on existing databases
+        await conn.run_sync(OptimizationResultRecord.__table__.create, checkfirst=True)
+        await conn.run_sync(create_incidence_indexes)
     async with async_session() as session:    
         await init_db(session=session)
 
+@app.on_event("shutdown")
+async def shutdown():
+    optimizer_jobs.shutdown()
+
 if __name__ == "__main__":
     uvicorn.run("main:app", host=settings.HOST, port=settings.PORT)
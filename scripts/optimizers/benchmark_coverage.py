@@ -0,0 +1,93 @@
+"""
+Compara las representaciones de cobertura (densa, dispersa y en bits) sobre una
+instancia sintética: memoria, tiempo de construcción y tiempo de evaluación.
+
+Uso:
+    python -m scripts.optimizers.benchmark_coverage --locations 4000 --points 16000
+"""
+import argparse
+import json
+import time
+import numpy as np
+
+from scripts.optimizers.benchmarks import best_time, peak_memory
+from scripts.optimizers.coverage import BitsetCoverage, SparseCoverage
+from scripts.optimizers.spatial import radius_neighbors
+
+
+def benchmark_coverage(num_locations: int = 4000,
+                       num_points: int = 16000,
+                       coverage_radius: float = 1.0,
+                       extent_km: float = 30.0,
+                       max_facilities: int = 50,
+                       pop_size: int = 50,
+                       repeat: int = 5,
+                       seed: int = 0):
+    """
+    Retorna un dict por formato con nbytes, tiempo de construcción y tiempo de
+    evaluar una solución (`covered` + demanda) y una población completa.
+    """
+    rng = np.random.default_rng(seed)
+    extent_deg = extent_km / 111.195
+    points = np.column_stack([
+        -12.0 + rng.random(num_points) * extent_deg,
+        -77.0 + rng.random(num_points) * extent_deg,
+    ])
+    facilities = rng.choice(num_points, size=min(num_locations, num_points), replace=False)
+    demands = rng.random(num_points)
+    solution = np.zeros(len(facilities), dtype=bool)
+    solution[rng.choice(len(facilities), size=max_facilities, replace=False)] = True
+    population = rng.random((pop_size, len(facilities))) < max_facilities / len(facilities)
+
+    started = time.perf_counter()
+    indptr, indices = radius_neighbors(points[facilities], points, coverage_radius)
+    query_seconds = time.perf_counter() - started
+    builders = {
+        "sparse": lambda: SparseCoverage(indptr, indices, num_points),
+        "dense": lambda: SparseCoverage(indptr, indices, num_points).to_dense(),
+        "bitset": lambda: BitsetCoverage.from_csr(indptr, indices, num_points),
+    }
+
+    results = {"radius_query_seconds": query_seconds, "nnz": int(len(indices))}
+    reference = None
+    for name, build in builders.items():
+        started = time.perf_counter()
+        coverage = build()
+        build_seconds = time.perf_counter() - started
+        fitness = float(coverage.covered(solution) @ demands)
+        if reference is None:
+            reference = fitness
+        # Memoria temporal de evaluar la población (la cobertura no retiene copias)
+        _, evaluation_peak = peak_memory(lambda: coverage.covered_population(population))
+        results[name] = {
+            "nbytes": int(coverage.nbytes),
+            "evaluation_peak_bytes": int(evaluation_peak),
+            "build_seconds": build_seconds,
+            "solution_seconds": best_time(lambda: coverage.covered(solution) @ demands, repeat),
+            "population_seconds": best_time(lambda: coverage.covered_population(population) @ demands, repeat),
+            "fitness_matches": abs(fitness - reference) <= 1e-9 * max(1.0, abs(reference)),
+        }
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--locations", type=int, default=4000)
+    parser.add_argument("--points", type=int, default=16000)
+    parser.add_argument("--radius", type=float, default=1.0)
+    parser.add_argument("--extent-km", type=float, default=30.0)
+    parser.add_argument("--max-facilities", type=int, default=50)
+    parser.add_argument("--pop-size", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    print(json.dumps(benchmark_coverage(
+        num_locations=args.locations,
+        num_points=args.points,
+        coverage_radius=args.radius,
+        extent_km=args.extent_km,
+        max_facilities=args.max_facilities,
+        pop_size=args.pop_size,
+        repeat=args.repeat,
+        seed=args.seed,
+    ), indent=2))
@@ -0,0 +1,259 @@
+"""
+Banco de pruebas del optimizador de cobertura máxima.
+
+Genera instancias sintéticas de varios tamaños y densidades de cobertura y mide,
+para cada una, la construcción de distancias/cobertura, la evaluación de la
+función objetivo y la resolución completa con cada método. Cada etapa registra
+su tiempo y el pico de memoria (tracemalloc); el pico se mide en una ejecución
+aparte, porque tracemalloc intercepta cada asignación y ralentiza la etapa. El
+resultado se escribe en JSON para comparar ejecuciones antes de desplegar.
+
+Uso:
+    python -m scripts.optimizers.benchmarks --sizes small medium --output bench.json
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import time
+import tracemalloc
+import numpy as np
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from scripts.optimizers.kernels import USE_COMPILED_KERNELS
+from scripts.optimizers.maximal_covering_location import MaximalCoveringLocation, SOLVE_METHODS
+
+# Tamaños de instancia: (puntos de demanda, candidatos)
+SIZES = {
+    "small": (1000, 200),
+    "medium": (10000, 1000),
+    "large": (50000, 5000),
+}
+
+# Kilómetros por grado de latitud (radio medio de la Tierra de 6371 km)
+KM_PER_DEGREE = 111.195
+
+
+def best_time(fn: Callable[[], object], repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def timed(fn: Callable[[], object]) -> Tuple[object, float]:
+    """
+    Ejecuta `fn` una vez y retorna (resultado, segundos).
+    """
+    started = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - started
+
+
+def peak_memory(fn: Callable[[], object]) -> Tuple[object, int]:
+    """
+    Ejecuta `fn` una vez bajo tracemalloc y retorna (resultado, pico de memoria en
+    bytes). El tiempo de esta ejecución no es representativo: medirlo con `timed`.
+    """
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    try:
+        result = fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, peak
+
+
+def synthetic_instance(num_points: int,
+                       num_candidates: int,
+                       extent_km: float = 20.0,
+                       num_hotspots: int = 12,
+                       hotspot_share: float = 0.7,
+                       seed: int = 0):
+    """
+    Instancia sintética parecida a una ciudad: una parte de los puntos se agrupa
+    en focos gaussianos (zonas con muchas incidencias) y el resto es uniforme.
+    Las demandas siguen una log-normal y los candidatos son puntos al azar.
+
+    Retorna:
+    (points, demands, facilities)
+    """
+    rng = np.random.default_rng(seed)
+    extent_deg = extent_km / KM_PER_DEGREE
+    origin = np.array([-12.0, -77.0])
+    in_hotspots = int(num_points * hotspot_share)
+    centers = origin + rng.random((num_hotspots, 2)) * extent_deg
+    spread = extent_deg / 30
+    clustered = centers[rng.integers(num_hotspots, size=in_hotspots)] + rng.normal(0, spread, (in_hotspots, 2))
+    uniform = origin + rng.random((num_points - in_hotspots, 2)) * extent_deg
+    points = np.vstack([clustered, uniform])
+    demands = rng.lognormal(mean=0.0, sigma=1.0, size=num_points)
+    facilities = np.sort(rng.choice(num_points, size=min(num_candidates, num_points), replace=False))
+    return points, demands, facilities
+
+
+def _coverage_pairs(coverage) -> int:
+    if hasattr(coverage, "nnz"):
+        return int(coverage.nnz)
+    if hasattr(coverage, "matrix"):
+        return int(coverage.matrix.sum())
+    return int(coverage.cover_counts(np.ones(coverage.num_locations, dtype=bool)).sum())
+
+
+def benchmark_instance(size: str,
+                       coverage_radius: float,
+                       coverage_format: str = "auto",
+                       methods: Sequence[str] = SOLVE_METHODS,
+                       max_facilities: int = 20,
+                       pop_size: int = 50,
+                       time_budget: Optional[float] = 10.0,
+                       patience: Optional[int] = 30,
+                       repeat: int = 5,
+                       seed: int = 0,
+                       measure_memory: bool = True) -> Dict[str, object]:
+    """
+    Con `measure_memory` cada etapa se repite una vez más bajo tracemalloc para
+    obtener su pico de memoria; sin él los picos quedan en None.
+    """
+    num_points, num_candidates = SIZES[size]
+    points, demands, facilities = synthetic_instance(num_points, num_candidates, seed=seed)
+
+    def peak(fn: Callable[[], object]) -> Optional[int]:
+        return peak_memory(fn)[1] if measure_memory else None
+
+    # Sin caché: la construcción incluye la matriz de distancias (densa) o la consulta por radio
+    def build():
+        return MaximalCoveringLocation(
+            points=points, demands=demands, facilities=facilities, max_facilities=max_facilities,
+            coverage_radius=coverage_radius, use_cache=False, coverage_format=coverage_format
+        )
+
+    model, build_seconds = timed(build)
+    build_peak = peak(build)
+    pairs = _coverage_pairs(model.coverage)
+
+    rng = np.random.default_rng(seed)
+    solution = np.zeros(model.num_locations)
+    solution[rng.choice(model.num_locations, size=min(max_facilities, model.num_locations), replace=False)] = 1
+    population = (rng.random((pop_size, model.num_locations)) < max_facilities / model.num_locations).astype(float)
+    # Primera llamada fuera de la medición: copias perezosas y compilación de kernels
+    model.objective_function(solution)
+    model.evaluate_population(population)
+    population_peak = peak(lambda: model.evaluate_population(population))
+
+    total_demand = float(demands.sum())
+    solves = {}
+    for method in methods:
+        def solve():
+            return model.solve(method=method, time_budget=time_budget, patience=patience, seed=seed)
+
+        result, seconds = timed(solve)
+        # Misma semilla: la segunda ejecución recorre la misma búsqueda (salvo el presupuesto de tiempo)
+        solve_peak = peak(solve)
+        selected = np.asarray(result['solution']) == 1
+        covered = float(model.coverage.covered_weight(selected, demands))
+        solves[method] = {
+            "seconds": seconds,
+            "peak_bytes": solve_peak,
+            "Fitness": result['Fitness'],
+            # Las metaheurísticas pueden terminar con más instalaciones que max_facilities
+            "facilities_opened": int(selected.sum()),
+            "feasible": bool(selected.sum() <= max_facilities),
+            "coverage_ratio": covered / total_demand if total_demand > 0 else 0.0,
+            "epochs_run": result['epochs_run'],
+            "stop_reason": result['stop_reason'],
+        }
+
+    return {
+        "size": size,
+        "num_points": num_points,
+        "num_candidates": int(len(facilities)),
+        "coverage_radius": coverage_radius,
+        "coverage_format": model.coverage_format,
+        "coverage_pairs": pairs,
+        "mean_points_per_candidate": pairs / max(model.num_locations, 1),
+        "coverage_bytes": int(model.coverage.nbytes),
+        "distance_build": {"seconds": build_seconds, "peak_bytes": build_peak},
+        "objective": {
+            "single_seconds": best_time(lambda: model.objective_function(solution), repeat),
+            "population_seconds": best_time(lambda: model.evaluate_population(population), repeat),
+            "population_peak_bytes": population_peak,
+            "pop_size": pop_size,
+        },
+        "solve": solves,
+    }
+
+
+def run_benchmarks(sizes: Sequence[str] = ("small", "medium"),
+                   radii: Sequence[float] = (0.5, 1.0, 2.0),
+                   coverage_formats: Sequence[str] = ("auto",),
+                   methods: Sequence[str] = SOLVE_METHODS,
+                   **options) -> Dict[str, object]:
+    """
+    Ejecuta `benchmark_instance` para cada combinación tamaño × radio × formato.
+    """
+    instances: List[Dict[str, object]] = []
+    for size in sizes:
+        for coverage_radius in radii:
+            for coverage_format in coverage_formats:
+                instances.append(benchmark_instance(
+                    size, coverage_radius, coverage_format=coverage_format, methods=methods, **options
+                ))
+    return {
+        "environment": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "kernels": "numba" if USE_COMPILED_KERNELS else "numpy",
+        },
+        "options": {"sizes": list(sizes), "radii": list(radii), "coverage_formats": list(coverage_formats),
+                    "methods": list(methods), **options},
+        "instances": instances,
+        # ru_maxrss está en KiB en Linux
+        "max_rss_bytes": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", nargs="+", choices=list(SIZES), default=["small", "medium"])
+    parser.add_argument("--radii", nargs="+", type=float, default=[0.5, 1.0, 2.0])
+    parser.add_argument("--formats", nargs="+", choices=["auto", "dense", "sparse", "bitset"], default=["auto"])
+    parser.add_argument("--methods", nargs="+", choices=list(SOLVE_METHODS), default=list(SOLVE_METHODS))
+    parser.add_argument("--max-facilities", type=int, default=20)
+    parser.add_argument("--pop-size", type=int, default=50)
+    parser.add_argument("--time-budget", type=float, default=10.0)
+    parser.add_argument("--patience", type=int, default=30)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-memory", action="store_true",
+                        help="No repetir cada etapa bajo tracemalloc para medir su pico de memoria")
+    parser.add_argument("--output", help="Fichero JSON de salida (por defecto, la salida estándar)")
+    args = parser.parse_args()
+
+    report = run_benchmarks(
+        sizes=args.sizes,
+        radii=args.radii,
+        coverage_formats=args.formats,
+        methods=args.methods,
+        max_facilities=args.max_facilities,
+        pop_size=args.pop_size,
+        time_budget=args.time_budget,
+        patience=args.patience,
+        repeat=args.repeat,
+        seed=args.seed,
+        measure_memory=not args.no_memory,
+    )
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as handle:
+            handle.write(text)
+    else:
+        print(text)
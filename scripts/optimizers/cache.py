@@ -0,0 +1,139 @@
+import hashlib
+import multiprocessing
+import os
+import threading
+import numpy as np
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable
+
+from scripts.optimizers import shared
+
+# Tamaño máximo (bytes) de las matrices guardadas por proceso
+MATRIX_CACHE_MAX_BYTES = int(os.environ.get("OPTIMIZER_MATRIX_CACHE_BYTES", 256 * 1024 * 1024))
+
+HITS, MISSES, EVICTIONS, SHARED_HITS = range(4)
+
+
+def fingerprint(*arrays: np.ndarray) -> str:
+    """
+    Huella de contenido de uno o varios arreglos (dtype, forma y bytes).
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for array in arrays:
+        array = np.ascontiguousarray(array)
+        digest.update(f"{array.dtype.str}{array.shape}".encode())
+        digest.update(array.tobytes())
+    return digest.hexdigest()
+
+
+def create_shared_counters():
+    """
+    Contadores de aciertos/fallos/desalojos compartidos entre procesos.
+    """
+    return multiprocessing.Array("q", 4)
+
+
+class MatrixCache(object):
+    """
+    Caché LRU de matrices NumPy (o estructuras con atributo `nbytes`, como las
+    coberturas) acotada por tamaño en bytes.
+
+    Las matrices se guardan en sólo lectura, ya que se comparten entre todas
+    las resoluciones del proceso. Antes de calcular un valor se busca en memoria
+    compartida (ver scripts.optimizers.shared) y los valores grandes calculados
+    se publican ahí, de modo que los demás procesos de la máquina los reutilizan
+    sin copiarlos.
+    """
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        # Referencias a los segmentos compartidos de las entradas publicadas
+        self._blocks: Dict[Hashable, Any] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._counters = [0, 0, 0, 0]
+
+    def use_shared_counters(self, counters) -> None:
+        self._counters = counters
+
+    def _count(self, index: int) -> None:
+        lock = getattr(self._counters, "get_lock", None)
+        if lock is None:
+            self._counters[index] += 1
+            return
+        with lock():
+            self._counters[index] += 1
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        with self._lock:
+            array = self._entries.get(key)
+            if array is not None:
+                self._entries.move_to_end(key)
+                self._count(HITS)
+                return array
+        attached = shared.attach(key)
+        if attached is not None:
+            self._count(SHARED_HITS)
+            array, block = attached
+        else:
+            self._count(MISSES)
+            array = compute()
+            if isinstance(array, np.ndarray):
+                array.setflags(write=False)
+            # Sólo se publica lo que la caché va a conservar
+            block = None
+            if array.nbytes <= self.max_bytes:
+                array, block = shared.publish(key, array)
+        self._store(key, array, block)
+        return array
+
+    def _store(self, key: Hashable, array: Any, block: Any = None) -> None:
+        # Los arreglos compartidos mantienen vivo su segmento por sí mismos (ver
+        # scripts.optimizers.shared); `_blocks` conserva la referencia de la entrada
+        if array.nbytes > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous.nbytes
+            self._entries[key] = array
+            self._bytes += array.nbytes
+            if block is not None:
+                self._blocks[key] = block
+            else:
+                self._blocks.pop(key, None)
+            while self._bytes > self.max_bytes:
+                evicted_key, evicted = self._entries.popitem(last=False)
+                self._blocks.pop(evicted_key, None)
+                self._bytes -= evicted.nbytes
+                self._count(EVICTIONS)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._blocks.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": int(self._counters[HITS]),
+                "misses": int(self._counters[MISSES]),
+                "evictions": int(self._counters[EVICTIONS]),
+                "shared_hits": int(self._counters[SHARED_HITS]),
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+
+matrix_cache = MatrixCache(MATRIX_CACHE_MAX_BYTES)
+
+
+def install_shared_counters(counters) -> None:
+    """
+    Inicializador de pools de procesos: todos los trabajadores acumulan sus
+    aciertos y fallos en los mismos contadores.
+    """
+    matrix_cache.use_shared_counters(counters)
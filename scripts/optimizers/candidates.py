@@ -0,0 +1,130 @@
+import numpy as np
+from typing import List, Optional, Sequence, Tuple
+
+from scripts.optimizers.geo import EARTH_RADIUS_KM
+
+# Candidatos propuestos cuando la petición no trae `facilities` ni `num_candidates`
+DEFAULT_NUM_CANDIDATES = 200
+
+# Filas procesadas por bloque al buscar el centro más cercano (limita la memoria a bloque × k)
+ASSIGN_CHUNK_SIZE = 4096
+
+# Puntos muestreados para la inicialización k-means++ (cada paso recorre la muestra)
+INIT_SAMPLE_SIZE = 20000
+
+
+def _project(points: np.ndarray) -> np.ndarray:
+    # Proyección equirectangular en km alrededor de la latitud media
+    lat0 = np.deg2rad(points[:, 0].mean())
+    return np.column_stack([
+        np.deg2rad(points[:, 0]) * EARTH_RADIUS_KM,
+        np.deg2rad(points[:, 1]) * EARTH_RADIUS_KM * np.cos(lat0),
+    ])
+
+
+def _nearest(xy: np.ndarray, centers: np.ndarray) -> np.ndarray:
+    """
+    Para cada fila de `xy`, índice del centro más cercano.
+    """
+    labels = np.empty(len(xy), dtype=np.int64)
+    # argmin de |x - c|² = argmin de |c|² - 2 x·c (|x|² es constante por fila)
+    scaled_centers = -2 * centers.T
+    center_norms = (centers ** 2).sum(axis=1)
+    for start in range(0, len(xy), ASSIGN_CHUNK_SIZE):
+        block = xy[start:start + ASSIGN_CHUNK_SIZE] @ scaled_centers
+        block += center_norms
+        labels[start:start + len(block)] = block.argmin(axis=1)
+    return labels
+
+
+def _weighted_choice(scores: np.ndarray, rng: np.random.Generator) -> int:
+    cumulative = np.cumsum(scores)
+    index = int(np.searchsorted(cumulative, rng.random() * cumulative[-1], side="right"))
+    return min(index, len(scores) - 1)
+
+
+def _kmeans_plus_plus(xy: np.ndarray, weights: np.ndarray, k: int, rng: np.random.Generator) -> np.ndarray:
+    centers = np.empty((k, 2))
+    centers[0] = xy[_weighted_choice(weights, rng)]
+    sq_distances = ((xy - centers[0]) ** 2).sum(axis=1)
+    for c in range(1, k):
+        scores = weights * sq_distances
+        index = _weighted_choice(scores, rng) if scores.sum() > 0 else rng.integers(len(xy))
+        centers[c] = xy[index]
+        np.minimum(sq_distances, ((xy - centers[c]) ** 2).sum(axis=1), out=sq_distances)
+    return centers
+
+
+def kmeans_candidates(points: Sequence[Tuple[float, float]],
+                      demands: Sequence[float],
+                      num_candidates: int = DEFAULT_NUM_CANDIDATES,
+                      max_iterations: int = 20,
+                      tol: float = 1e-3,
+                      seed: Optional[int] = None) -> List[int]:
+    """
+    Propone candidatos a instalación con k-means ponderado por la demanda
+    (inicialización k-means++ sobre una muestra y Lloyd vectorizado) sobre las
+    coordenadas proyectadas en km. Cada centroide se ajusta al punto de demanda más cercano,
+    de modo que los candidatos siguen siendo índices de `points`.
+
+    Parámetros:
+    num_candidates: número de clusters; el resultado puede ser menor si algún
+        cluster queda vacío.
+    tol: desplazamiento máximo de los centroides (km) para dar por convergido.
+
+    Retorna:
+    Lista ordenada de índices de `points`.
+    """
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    num_points = len(points)
+    if num_candidates >= num_points:
+        return list(range(num_points))
+    if num_candidates <= 0:
+        return []
+    weights = np.clip(np.asarray(demands, dtype=np.float64), 0.0, None)
+    if weights.sum() <= 0:
+        weights = np.ones(num_points)
+
+    rng = np.random.default_rng(seed)
+    xy = _project(points)
+    sample = np.arange(num_points)
+    if num_points > INIT_SAMPLE_SIZE:
+        sample = rng.choice(num_points, size=INIT_SAMPLE_SIZE, replace=False)
+    centers = _kmeans_plus_plus(xy[sample], weights[sample], num_candidates, rng)
+    for _ in range(max_iterations):
+        labels = _nearest(xy, centers)
+        mass = np.bincount(labels, weights=weights, minlength=num_candidates)
+        updated = centers.copy()
+        filled = mass > 0
+        for axis in range(2):
+            sums = np.bincount(labels, weights=weights * xy[:, axis], minlength=num_candidates)
+            updated[filled, axis] = sums[filled] / mass[filled]
+        shift = np.sqrt(((updated - centers) ** 2).sum(axis=1)).max()
+        centers = updated
+        if shift < tol:
+            break
+
+    # Punto más cercano al centroide dentro de cada cluster: primero de cada grupo
+    # al ordenar por (cluster, distancia)
+    labels = _nearest(xy, centers)
+    sq_distances = ((xy - centers[labels]) ** 2).sum(axis=1)
+    order = np.lexsort((sq_distances, labels))
+    sorted_labels = labels[order]
+    first = np.concatenate([[True], sorted_labels[1:] != sorted_labels[:-1]])
+    return sorted(int(index) for index in order[first])
+
+
+def candidate_facilities(points: Sequence[Tuple[float, float]],
+                         demands: Sequence[float],
+                         facilities: Optional[Sequence[int]] = None,
+                         num_candidates: Optional[int] = None,
+                         seed: Optional[int] = None) -> List[int]:
+    """
+    Candidatos a usar en el modelo: los indicados por quien llama o, si no hay,
+    los propuestos por `kmeans_candidates`.
+    """
+    if facilities is not None:
+        return list(facilities)
+    return kmeans_candidates(
+        points, demands, num_candidates=num_candidates or DEFAULT_NUM_CANDIDATES, seed=seed
+    )
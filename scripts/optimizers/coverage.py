@@ -0,0 +1,260 @@
+import numpy as np
+
+from scripts.optimizers.kernels import (
+    USE_COMPILED_KERNELS, csr_covered_weight, csr_covered_weight_population,
+    csr_uncovered_weight, csr_weighted_sums, dense_covered_weight,
+    dense_covered_weight_population, dense_uncovered_weight, dense_weighted_sums
+)
+from scripts.optimizers.spatial import expand_ranges
+
+# Columnas de la matriz densa convertidas a float por bloque: la copia temporal
+# ocupa como mucho num_locations × bloque y nunca se guarda en el objeto, así que
+# `nbytes` es toda la memoria que retiene una cobertura (caché LRU y memoria compartida)
+DENSE_COLUMN_BLOCK = 8192
+
+
+class DenseCoverage(object):
+    """
+    Cobertura como matriz booleana (num_locations, num_demand_points).
+    """
+
+    def __init__(self, matrix: np.ndarray) -> None:
+        self.matrix = matrix
+        self.num_locations, self.num_demand_points = matrix.shape
+
+    @property
+    def nbytes(self) -> int:
+        return self.matrix.nbytes
+
+    def _column_blocks(self):
+        for start in range(0, self.num_demand_points, DENSE_COLUMN_BLOCK):
+            yield slice(start, min(start + DENSE_COLUMN_BLOCK, self.num_demand_points))
+
+    def row(self, location: int) -> np.ndarray:
+        return np.flatnonzero(self.matrix[location])
+
+    def covered(self, selected: np.ndarray) -> np.ndarray:
+        return self.matrix[selected].any(axis=0)
+
+    def cover_counts(self, selected: np.ndarray) -> np.ndarray:
+        return self.matrix[selected].sum(axis=0)
+
+    def covered_population(self, selected: np.ndarray) -> np.ndarray:
+        # Producto float32 por bloques de columnas (exacto hasta 2**24 candidatos)
+        agents = selected.astype(np.float32)
+        covered = np.empty((selected.shape[0], self.num_demand_points), dtype=bool)
+        for block in self._column_blocks():
+            covered[:, block] = (agents @ self.matrix[:, block].astype(np.float32)) > 0
+        return covered
+
+    def covered_weight(self, selected: np.ndarray, demands: np.ndarray) -> float:
+        if USE_COMPILED_KERNELS:
+            return dense_covered_weight(self.matrix, np.flatnonzero(selected), demands)
+        return np.dot(self.covered(selected), demands)
+
+    def covered_weight_population(self, selected: np.ndarray, demands: np.ndarray) -> np.ndarray:
+        if USE_COMPILED_KERNELS:
+            return dense_covered_weight_population(self.matrix, selected, demands)
+        return self.covered_population(selected) @ demands
+
+    def uncovered_weight(self, location: int, demands: np.ndarray, covered: np.ndarray) -> float:
+        if USE_COMPILED_KERNELS:
+            return dense_uncovered_weight(self.matrix, location, demands, covered)
+        row = self.row(location)
+        return demands[row[~covered[row]]].sum()
+
+    def weighted_sums(self, weights: np.ndarray) -> np.ndarray:
+        if USE_COMPILED_KERNELS:
+            return dense_weighted_sums(self.matrix, weights)
+        sums = np.zeros(self.num_locations, dtype=np.float64)
+        for block in self._column_blocks():
+            sums += self.matrix[:, block].astype(np.float64) @ weights[block]
+        return sums
+
+
+class SparseCoverage(object):
+    """
+    Cobertura en formato CSR: indices[indptr[i]:indptr[i + 1]] son los puntos de
+    demanda cubiertos por el candidato i. La memoria es proporcional al número
+    de pares cubiertos.
+    """
+
+    def __init__(self, indptr: np.ndarray, indices: np.ndarray, num_demand_points: int) -> None:
+        self.indptr = indptr
+        self.indices = indices
+        self.num_locations = len(indptr) - 1
+        self.num_demand_points = num_demand_points
+
+    @property
+    def nbytes(self) -> int:
+        return self.indptr.nbytes + self.indices.nbytes
+
+    @property
+    def nnz(self) -> int:
+        return len(self.indices)
+
+    @property
+    def row_ids(self) -> np.ndarray:
+        # Candidato dueño de cada par cubierto; no se guarda para que `nbytes` sea exacto
+        return np.repeat(np.arange(self.num_locations, dtype=np.int32), np.diff(self.indptr))
+
+    def row(self, location: int) -> np.ndarray:
+        return self.indices[self.indptr[location]:self.indptr[location + 1]]
+
+    def _gather(self, locations: np.ndarray):
+        starts = self.indptr[locations]
+        positions, owners = expand_ranges(starts, self.indptr[locations + 1] - starts)
+        return self.indices[positions], owners
+
+    def covered(self, selected: np.ndarray) -> np.ndarray:
+        demand_points, _ = self._gather(np.flatnonzero(selected))
+        covered = np.zeros(self.num_demand_points, dtype=bool)
+        covered[demand_points] = True
+        return covered
+
+    def cover_counts(self, selected: np.ndarray) -> np.ndarray:
+        demand_points, _ = self._gather(np.flatnonzero(selected))
+        return np.bincount(demand_points, minlength=self.num_demand_points)
+
+    def covered_population(self, selected: np.ndarray) -> np.ndarray:
+        agents, locations = np.nonzero(selected)
+        demand_points, owners = self._gather(locations)
+        covered = np.zeros((selected.shape[0], self.num_demand_points), dtype=bool)
+        covered[agents[owners], demand_points] = True
+        return covered
+
+    def covered_weight(self, selected: np.ndarray, demands: np.ndarray) -> float:
+        if USE_COMPILED_KERNELS:
+            return csr_covered_weight(self.indptr, self.indices, np.flatnonzero(selected), demands)
+        return np.dot(self.covered(selected), demands)
+
+    def covered_weight_population(self, selected: np.ndarray, demands: np.ndarray) -> np.ndarray:
+        if USE_COMPILED_KERNELS:
+            return csr_covered_weight_population(self.indptr, self.indices, selected, demands)
+        return self.covered_population(selected) @ demands
+
+    def uncovered_weight(self, location: int, demands: np.ndarray, covered: np.ndarray) -> float:
+        if USE_COMPILED_KERNELS:
+            return csr_uncovered_weight(self.indptr, self.indices, location, demands, covered)
+        row = self.row(location)
+        return demands[row[~covered[row]]].sum()
+
+    def weighted_sums(self, weights: np.ndarray) -> np.ndarray:
+        if USE_COMPILED_KERNELS:
+            return csr_weighted_sums(self.indptr, self.indices, weights)
+        return np.bincount(self.row_ids, weights=weights[self.indices], minlength=self.num_locations)
+
+    def to_dense(self) -> DenseCoverage:
+        matrix = np.zeros((self.num_locations, self.num_demand_points), dtype=bool)
+        matrix[self.row_ids, self.indices] = True
+        matrix.setflags(write=False)
+        return DenseCoverage(matrix)
+
+    def to_bitset(self) -> "BitsetCoverage":
+        return BitsetCoverage.from_csr(self.indptr, self.indices, self.num_demand_points)
+
+
+class BitsetCoverage(object):
+    """
+    Cobertura empaquetada en bits: la fila i es un bitset de palabras uint64 donde
+    el bit j (orden little-endian) indica si el candidato i cubre el punto j.
+    Ocupa 1/8 de la matriz booleana y la unión de filas es un OR por palabras, así
+    que las filas de una solución caben en caché incluso con decenas de miles de
+    candidatos.
+    """
+
+    def __init__(self, words: np.ndarray, num_demand_points: int) -> None:
+        self.words = words
+        self.num_locations = words.shape[0]
+        self.num_demand_points = num_demand_points
+
+    @staticmethod
+    def num_words(num_demand_points: int) -> int:
+        return (num_demand_points + 63) // 64
+
+    @classmethod
+    def from_dense(cls, matrix: np.ndarray) -> "BitsetCoverage":
+        num_locations, num_demand_points = matrix.shape
+        packed = np.zeros((num_locations, cls.num_words(num_demand_points) * 8), dtype=np.uint8)
+        packed[:, :(num_demand_points + 7) // 8] = np.packbits(matrix, axis=1, bitorder="little")
+        return cls(packed.view("<u8"), num_demand_points)
+
+    @classmethod
+    def from_csr(cls, indptr: np.ndarray, indices: np.ndarray, num_demand_points: int) -> "BitsetCoverage":
+        num_locations = len(indptr) - 1
+        words = np.zeros((num_locations, cls.num_words(num_demand_points)), dtype="<u8")
+        row_ids = np.repeat(np.arange(num_locations), np.diff(indptr))
+        bits = np.left_shift(np.uint64(1), (indices & 63).astype(np.uint64))
+        np.bitwise_or.at(words, (row_ids, indices >> 6), bits)
+        return cls(words, num_demand_points)
+
+    @property
+    def nbytes(self) -> int:
+        return self.words.nbytes
+
+    def _unpack(self, words: np.ndarray) -> np.ndarray:
+        # (..., num_words) uint64 -> (..., num_demand_points) bool
+        bits = np.unpackbits(words.view(np.uint8), axis=-1, count=self.num_demand_points, bitorder="little")
+        return bits.view(bool)
+
+    def _union(self, selected: np.ndarray) -> np.ndarray:
+        return np.bitwise_or.reduce(self.words[selected], axis=0)
+
+    def row(self, location: int) -> np.ndarray:
+        return np.flatnonzero(self._unpack(self.words[location]))
+
+    def covered(self, selected: np.ndarray) -> np.ndarray:
+        if not np.any(selected):
+            return np.zeros(self.num_demand_points, dtype=bool)
+        return self._unpack(self._union(selected))
+
+    def cover_counts(self, selected: np.ndarray) -> np.ndarray:
+        return self._unpack(self.words[selected]).sum(axis=0)
+
+    def covered_population(self, selected: np.ndarray) -> np.ndarray:
+        unions = np.zeros((selected.shape[0], self.words.shape[1]), dtype=self.words.dtype)
+        for agent, agent_selected in enumerate(selected):
+            if agent_selected.any():
+                unions[agent] = self._union(agent_selected)
+        return self._unpack(unions)
+
+    def covered_weight(self, selected: np.ndarray, demands: np.ndarray) -> float:
+        return np.dot(self.covered(selected), demands)
+
+    def covered_weight_population(self, selected: np.ndarray, demands: np.ndarray) -> np.ndarray:
+        return self.covered_population(selected) @ demands
+
+    def uncovered_weight(self, location: int, demands: np.ndarray, covered: np.ndarray) -> float:
+        row = self.row(location)
+        return demands[row[~covered[row]]].sum()
+
+    def weighted_sums(self, weights: np.ndarray, chunk_size: int = 1024) -> np.ndarray:
+        sums = np.empty(self.num_locations, dtype=np.float64)
+        for start in range(0, self.num_locations, chunk_size):
+            stop = min(start + chunk_size, self.num_locations)
+            sums[start:stop] = self._unpack(self.words[start:stop]) @ weights
+        return sums
+
+
+class NestedCoverage(object):
+    """
+    Coberturas anidadas para varios radios a partir de una sola consulta con el
+    radio máximo: cada fila CSR se ordena por distancia, de modo que la cobertura
+    de cualquier radio menor es un prefijo de cada fila.
+    """
+
+    def __init__(self, indptr: np.ndarray, indices: np.ndarray, distances: np.ndarray,
+                 num_demand_points: int) -> None:
+        self.max_coverage = SparseCoverage(indptr, indices, num_demand_points)
+        order = np.lexsort((distances, self.max_coverage.row_ids))
+        self.indices = indices[order]
+        self.distances = distances[order]
+        self.row_ids = self.max_coverage.row_ids
+        self.num_locations = self.max_coverage.num_locations
+        self.num_demand_points = num_demand_points
+
+    def at_radius(self, radius: float) -> SparseCoverage:
+        within = self.distances <= radius
+        indptr = np.zeros(self.num_locations + 1, dtype=np.int64)
+        indptr[1:] = np.cumsum(np.bincount(self.row_ids[within], minlength=self.num_locations))
+        return SparseCoverage(indptr, self.indices[within], self.num_demand_points)
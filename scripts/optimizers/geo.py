@@ -0,0 +1,80 @@
+import numpy as np
+from typing import Optional, Sequence, Tuple
+
+# Radio de la Tierra en kilómetros
+EARTH_RADIUS_KM = 6371.0
+
+
+def haversine_distance(coord1, coord2):
+    # Convertir grados a radianes
+    lat1, lon1 = np.deg2rad(coord1)
+    lat2, lon2 = np.deg2rad(coord2)
+
+    # Diferencias
+    dlat = lat2 - lat1
+    dlon = lon2 - lon1
+
+    # Fórmula de Haversine
+    a = np.sin(dlat / 2)**2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2)**2
+    c = 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+    distance = EARTH_RADIUS_KM * c
+
+    return distance
+
+
+def _as_radians(coords: Sequence[Tuple[float, float]]) -> np.ndarray:
+    coords = np.asarray(coords, dtype=np.float64).reshape(-1, 2)
+    return np.deg2rad(coords)
+
+
+def haversine_distance_matrix(origins: Sequence[Tuple[float, float]],
+                              destinations: Optional[Sequence[Tuple[float, float]]] = None,
+                              chunk_size: Optional[int] = None) -> np.ndarray:
+    """
+    Calcula la matriz de distancias Haversine (km) entre `origins` y `destinations`
+    con broadcasting de NumPy. Coincide con `haversine_distance` aplicada par a par
+    salvo por el redondeo de punto flotante (error relativo del orden de 1e-15).
+
+    Parámetros:
+    origins: lista de coordenadas (lat, lon) en grados, forma (n, 2).
+    destinations: lista de coordenadas (lat, lon) en grados, forma (m, 2).
+        Si es None se usa `origins` (matriz cuadrada).
+    chunk_size: número máximo de filas calculadas por bloque. Limita la memoria
+        temporal a chunk_size × m valores en lugar de n × m.
+
+    Retorna:
+    np.ndarray de forma (n, m) y dtype float64.
+    """
+    origins_rad = _as_radians(origins)
+    destinations_rad = origins_rad if destinations is None else _as_radians(destinations)
+    n, m = len(origins_rad), len(destinations_rad)
+
+    lat2 = destinations_rad[:, 0][np.newaxis, :]
+    lon2 = destinations_rad[:, 1][np.newaxis, :]
+    cos_lat2 = np.cos(lat2)
+
+    if chunk_size is None or chunk_size <= 0:
+        chunk_size = max(n, 1)
+
+    distances = np.empty((n, m), dtype=np.float64)
+    for start in range(0, n, chunk_size):
+        stop = min(start + chunk_size, n)
+        lat1 = origins_rad[start:stop, 0][:, np.newaxis]
+        lon1 = origins_rad[start:stop, 1][:, np.newaxis]
+        a = np.sin((lat2 - lat1) / 2)**2 + np.cos(lat1) * cos_lat2 * np.sin((lon2 - lon1) / 2)**2
+        distances[start:stop] = EARTH_RADIUS_KM * 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+    return distances
+
+
+def haversine_distance_pairs(origins: Sequence[Tuple[float, float]],
+                             destinations: Sequence[Tuple[float, float]]) -> np.ndarray:
+    """
+    Distancia Haversine (km) elemento a elemento entre origins[k] y destinations[k].
+    Usa la misma secuencia de operaciones que `haversine_distance_matrix`.
+    """
+    origins_rad = _as_radians(origins)
+    destinations_rad = _as_radians(destinations)
+    lat1, lon1 = origins_rad[:, 0], origins_rad[:, 1]
+    lat2, lon2 = destinations_rad[:, 0], destinations_rad[:, 1]
+    a = np.sin((lat2 - lat1) / 2)**2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2)**2
+    return EARTH_RADIUS_KM * 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
@@ -0,0 +1,93 @@
+import heapq
+import time
+import numpy as np
+from typing import List, Optional
+
+# Mejora mínima para aceptar un intercambio en la búsqueda local
+IMPROVEMENT_EPS = 1e-9
+
+
+def lazy_greedy(coverage,
+                demands: np.ndarray,
+                max_facilities: int) -> List[int]:
+    """
+    Selección voraz perezosa (lazy greedy) para el problema de cobertura máxima.
+
+    Mantiene una cola de prioridad con la ganancia marginal de cada candidato.
+    Como la cobertura es submodular, una ganancia sólo puede disminuir, así que
+    basta con recalcular la del tope de la cola hasta que siga siendo la mejor.
+
+    Parámetros:
+    coverage: DenseCoverage o SparseCoverage.
+    demands: vector de demandas (num_demand_points,).
+    max_facilities: número máximo de instalaciones a abrir.
+
+    Retorna:
+    Lista de índices de candidatos seleccionados, en orden de selección.
+    """
+    covered = np.zeros(coverage.num_demand_points, dtype=bool)
+    heap = [(-gain, idx) for idx, gain in enumerate(coverage.weighted_sums(demands))]
+    heapq.heapify(heap)
+    selected = []
+    while heap and len(selected) < max_facilities:
+        _, idx = heapq.heappop(heap)
+        gain = coverage.uncovered_weight(idx, demands, covered)
+        if heap and gain < -heap[0][0]:
+            heapq.heappush(heap, (-gain, idx))
+            continue
+        if gain <= 0:
+            break
+        selected.append(idx)
+        covered[coverage.row(idx)] = True
+    return selected
+
+
+def swap_local_search(coverage,
+                      demands: np.ndarray,
+                      selected: List[int],
+                      max_iterations: Optional[int] = None,
+                      deadline: Optional[float] = None) -> List[int]:
+    """
+    Búsqueda local por intercambio (1-swap) con la mejor mejora en cada paso.
+
+    Para cada candidato abierto i y cerrado j evalúa, de forma vectorizada,
+    la demanda que se gana al cerrar i y abrir j, y aplica el mejor intercambio
+    mientras mejore la cobertura. `deadline` (time.perf_counter) corta la
+    búsqueda entre iteraciones.
+
+    Retorna:
+    Lista de índices de candidatos seleccionados tras la búsqueda local.
+    """
+    selected = list(selected)
+    if not selected or len(selected) == coverage.num_locations:
+        return selected
+    iteration = 0
+    while max_iterations is None or iteration < max_iterations:
+        if deadline is not None and time.perf_counter() >= deadline:
+            break
+        iteration += 1
+        closed = np.ones(coverage.num_locations, dtype=bool)
+        closed[selected] = False
+        counts = coverage.cover_counts(~closed)
+        uncovered_demand = np.where(counts == 0, demands, 0.0)
+        unique_demand = np.where(counts == 1, demands, 0.0)
+        # Demanda nueva que aporta cada candidato j
+        gains = coverage.weighted_sums(uncovered_demand)
+
+        best_delta, best_swap = IMPROVEMENT_EPS, None
+        for position, idx in enumerate(selected):
+            # Demanda cubierta sólo por idx: se pierde al cerrarlo salvo que j la cubra
+            row = coverage.row(idx)
+            exclusive = np.zeros_like(unique_demand)
+            exclusive[row] = unique_demand[row]
+            loss = exclusive.sum()
+            delta = gains + coverage.weighted_sums(exclusive) - loss
+            delta[~closed] = -np.inf
+            candidate = int(np.argmax(delta))
+            if delta[candidate] > best_delta:
+                best_delta, best_swap = delta[candidate], (position, candidate)
+        if best_swap is None:
+            break
+        position, candidate = best_swap
+        selected[position] = candidate
+    return selected
@@ -0,0 +1,174 @@
+"""
+Kernels compilados (numba) para evaluar la cobertura y las ganancias del voraz.
+
+numba es opcional: si está instalado, las clases de scripts.optimizers.coverage
+usan estos kernels; si no, siguen con su implementación NumPy. La elección se
+hace al importar el módulo y puede forzarse con la variable de entorno
+OPTIMIZER_KERNELS ("auto", "numba" o "numpy").
+
+Comprobación de paridad contra la implementación NumPy:
+    python -m scripts.optimizers.kernels
+"""
+import os
+import numpy as np
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+KERNEL_BACKENDS = ("auto", "numba", "numpy")
+KERNEL_BACKEND = os.environ.get("OPTIMIZER_KERNELS", "auto").lower()
+if KERNEL_BACKEND not in KERNEL_BACKENDS:
+    raise ValueError(f"Unknown OPTIMIZER_KERNELS '{KERNEL_BACKEND}'. Supported values: {', '.join(KERNEL_BACKENDS)}.")
+if KERNEL_BACKEND == "numba" and numba is None:
+    raise ImportError("OPTIMIZER_KERNELS=numba requires the numba package.")
+
+USE_COMPILED_KERNELS = numba is not None and KERNEL_BACKEND != "numpy"
+
+
+def _jit(fn):
+    # Sin numba las funciones quedan como Python puro (sólo útil para la paridad)
+    if numba is None:
+        return fn
+    return numba.njit(cache=True, nogil=True)(fn)
+
+
+@_jit
+def dense_covered_weight(matrix, selected, demands):
+    covered = np.zeros(matrix.shape[1], dtype=np.bool_)
+    for i in selected:
+        row = matrix[i]
+        for j in range(matrix.shape[1]):
+            if row[j]:
+                covered[j] = True
+    total = 0.0
+    for j in range(matrix.shape[1]):
+        if covered[j]:
+            total += demands[j]
+    return total
+
+
+@_jit
+def dense_covered_weight_population(matrix, selected, demands):
+    totals = np.empty(selected.shape[0])
+    for agent in range(selected.shape[0]):
+        totals[agent] = dense_covered_weight(matrix, np.flatnonzero(selected[agent]), demands)
+    return totals
+
+
+@_jit
+def dense_weighted_sums(matrix, weights):
+    sums = np.zeros(matrix.shape[0])
+    for i in range(matrix.shape[0]):
+        row = matrix[i]
+        total = 0.0
+        for j in range(matrix.shape[1]):
+            if row[j]:
+                total += weights[j]
+        sums[i] = total
+    return sums
+
+
+@_jit
+def dense_uncovered_weight(matrix, location, demands, covered):
+    row = matrix[location]
+    total = 0.0
+    for j in range(matrix.shape[1]):
+        if row[j] and not covered[j]:
+            total += demands[j]
+    return total
+
+
+@_jit
+def csr_covered_weight(indptr, indices, selected, demands):
+    covered = np.zeros(demands.shape[0], dtype=np.bool_)
+    total = 0.0
+    for i in selected:
+        for k in range(indptr[i], indptr[i + 1]):
+            j = indices[k]
+            if not covered[j]:
+                covered[j] = True
+                total += demands[j]
+    return total
+
+
+@_jit
+def csr_covered_weight_population(indptr, indices, selected, demands):
+    totals = np.empty(selected.shape[0])
+    for agent in range(selected.shape[0]):
+        totals[agent] = csr_covered_weight(indptr, indices, np.flatnonzero(selected[agent]), demands)
+    return totals
+
+
+@_jit
+def csr_weighted_sums(indptr, indices, weights):
+    sums = np.zeros(indptr.shape[0] - 1)
+    for i in range(indptr.shape[0] - 1):
+        total = 0.0
+        for k in range(indptr[i], indptr[i + 1]):
+            total += weights[indices[k]]
+        sums[i] = total
+    return sums
+
+
+@_jit
+def csr_uncovered_weight(indptr, indices, location, demands, covered):
+    total = 0.0
+    for k in range(indptr[location], indptr[location + 1]):
+        j = indices[k]
+        if not covered[j]:
+            total += demands[j]
+    return total
+
+
+def check_parity(num_locations: int = 300, num_points: int = 2000, density: float = 0.05,
+                 pop_size: int = 20, seed: int = 0, rtol: float = 1e-9):
+    """
+    Compara cada kernel con la ruta NumPy de DenseCoverage y SparseCoverage sobre
+    coberturas aleatorias (incluidas soluciones vacías). Lanza AssertionError si
+    alguna diferencia supera `rtol`.
+    """
+    from scripts.optimizers import coverage as coverage_module
+
+    rng = np.random.default_rng(seed)
+    matrix = rng.random((num_locations, num_points)) < density
+    matrix[0] = False
+    indptr = np.concatenate([[0], np.cumsum(matrix.sum(axis=1))]).astype(np.int64)
+    indices = np.nonzero(matrix)[1].astype(np.int32)
+    demands = rng.random(num_points)
+    population = rng.random((pop_size, num_locations)) < 0.05
+    population[0] = False
+    covered = rng.random(num_points) < 0.3
+
+    def close(actual, expected):
+        np.testing.assert_allclose(actual, expected, rtol=rtol, atol=rtol)
+
+    previous = coverage_module.USE_COMPILED_KERNELS
+    coverage_module.USE_COMPILED_KERNELS = False
+    try:
+        dense = coverage_module.DenseCoverage(matrix)
+        sparse = coverage_module.SparseCoverage(indptr, indices, num_points)
+        for agent in population:
+            selected = np.flatnonzero(agent)
+            close(dense_covered_weight(matrix, selected, demands), dense.covered_weight(agent, demands))
+            close(csr_covered_weight(indptr, indices, selected, demands), sparse.covered_weight(agent, demands))
+        close(dense_covered_weight_population(matrix, population, demands),
+              dense.covered_weight_population(population, demands))
+        close(csr_covered_weight_population(indptr, indices, population, demands),
+              sparse.covered_weight_population(population, demands))
+        close(dense_weighted_sums(matrix, demands), dense.weighted_sums(demands))
+        close(csr_weighted_sums(indptr, indices, demands), sparse.weighted_sums(demands))
+        for location in range(num_locations):
+            expected = dense.uncovered_weight(location, demands, covered)
+            close(dense_uncovered_weight(matrix, location, demands, covered), expected)
+            close(csr_uncovered_weight(indptr, indices, location, demands, covered),
+                  sparse.uncovered_weight(location, demands, covered))
+    finally:
+        coverage_module.USE_COMPILED_KERNELS = previous
+
+
+if __name__ == "__main__":
+    check_parity()
+    backend = "numba" if USE_COMPILED_KERNELS else "numpy"
+    print(f"Kernel parity OK (active backend: {backend}, numba installed: {numba is not None})")
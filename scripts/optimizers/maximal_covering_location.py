@@ -1,26 +1,37 @@
+import os
+import time
 import numpy as np
+from concurrent.futures import ProcessPoolExecutor
 from mealpy.bio_based import BBO
 from mealpy import PSO, BinaryVar
-from typing import List, Tuple
-
-def haversine_distance(coord1, coord2):
-    # Radio de la Tierra en kilómetros
-    R = 6371.0
-    
-    # Convertir grados a radianes
-    lat1, lon1 = np.deg2rad(coord1)
-    lat2, lon2 = np.deg2rad(coord2)
-    
-    # Diferencias
-    dlat = lat2 - lat1
-    dlon = lon2 - lon1
-    
-    # Fórmula de Haversine
-    a = np.sin(dlat / 2)**2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2)**2
-    c = 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
-    distance = R * c
-    
-    return distance
+from mealpy.optimizer import Optimizer
+from mealpy.utils.target import Target
+from typing import Callable, List, Optional, Tuple
+
+from scripts.optimizers.cache import fingerprint, matrix_cache
+from scripts.optimizers.candidates import candidate_facilities
+from scripts.optimizers.coverage import BitsetCoverage, DenseCoverage, NestedCoverage, SparseCoverage
+from scripts.optimizers.geo import haversine_distance, haversine_distance_matrix
+from scripts.optimizers.greedy import lazy_greedy, swap_local_search
+from scripts.optimizers.spatial import radius_neighbors
+
+# Filas de la matriz de distancias calculadas por bloque
+DISTANCE_CHUNK_SIZE = 1024
+
+# Por encima de este número de celdas candidatos × demanda, "auto" usa cobertura dispersa
+DENSE_MAX_CELLS = 20_000_000
+COVERAGE_FORMATS = ("auto", "dense", "sparse", "bitset")
+
+# Metaheurísticas de mealpy disponibles para `solve`
+METAHEURISTICS = {
+    "bbo": lambda: BBO.OriginalBBO(epoch=500, pop_size=50),
+    "pso": lambda: PSO.OriginalPSO(epoch=500, pop_size=50),
+}
+SOLVE_METHODS = ("greedy",) + tuple(METAHEURISTICS)
+
+# Mejora mínima del mejor fitness para reiniciar la paciencia (mismo valor que mealpy)
+PATIENCE_EPSILON = 1e-10
+
 
 class MaximalCoveringLocation(object):
 
@@ -29,50 +40,607 @@ class MaximalCoveringLocation(object):
                  demands: List[float],  # Cambiado a float
                  facilities: List[int],
                  max_facilities: int,
-                 coverage_radius: float) -> None:
+                 coverage_radius: float,
+                 use_cache: bool = True,
+                 coverage_format: str = "auto",
+                 coverage=None) -> None:
         self.num_locations = len(facilities)
         self.num_demand_points = len(points)
-        self.dist_matrix_haversine = np.zeros((self.num_demand_points, self.num_demand_points), np.float64)
-        
-        for i in range(len(points)):
-            for j in range(len(points)):
-                self.dist_matrix_haversine[i, j] = haversine_distance(points[i], points[j])
-        
+        self.points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
         self.facilities = np.array(facilities, dtype=np.int32)
-        self.distances = self.dist_matrix_haversine
+        if self.facilities.size and (self.facilities.min() < 0 or self.facilities.max() >= self.num_demand_points):
+            raise ValueError("Facility indices must refer to positions in points.")
         self.demands = np.array(demands, dtype=np.float64)
         self.max_facilities = max_facilities
         self.coverage_radius = coverage_radius
+        self.use_cache = use_cache
+        # Huella de (points, facilities): las matrices se reutilizan entre resoluciones
+        self.key = fingerprint(self.points, self.facilities)
+        if coverage_format not in COVERAGE_FORMATS:
+            raise ValueError(f"Unknown coverage format '{coverage_format}'. Supported formats: {', '.join(COVERAGE_FORMATS)}.")
+        if coverage_format == "auto":
+            dense = self.num_locations * self.num_demand_points <= DENSE_MAX_CELLS
+            coverage_format = "dense" if dense else "sparse"
+        self.coverage_format = coverage_format
+        if coverage is not None:
+            # Cobertura ya calculada por quien llama (p. ej. sweep_covering_location)
+            self.coverage = coverage
+            return
+        # Cobertura del candidato i sobre el punto de demanda j (DenseCoverage o SparseCoverage)
+        builders = {
+            "dense": self._build_dense_coverage,
+            "sparse": self._build_sparse_coverage,
+            "bitset": self._build_bitset_coverage,
+        }
+        self.coverage = self._cached(
+            ("coverage", coverage_format, self.key, float(coverage_radius)),
+            builders[coverage_format]
+        )
+
+    def _cached(self, key, compute):
+        if not self.use_cache:
+            return compute()
+        return matrix_cache.get_or_compute(key, compute)
+
+    @property
+    def dist_matrix_haversine(self) -> np.ndarray:
+        # Matriz rectangular candidatos × puntos de demanda: la fila i corresponde
+        # al candidato facilities[i], no al punto i.
+        return self._cached(
+            ("distance", self.key),
+            lambda: haversine_distance_matrix(
+                self.points[self.facilities], self.points, chunk_size=DISTANCE_CHUNK_SIZE
+            )
+        )
+
+    @property
+    def distances(self) -> np.ndarray:
+        return self.dist_matrix_haversine
+
+    def _build_dense_coverage(self) -> DenseCoverage:
+        matrix = self.distances <= self.coverage_radius
+        matrix.setflags(write=False)
+        return DenseCoverage(matrix)
+
+    def _build_sparse_coverage(self) -> SparseCoverage:
+        # Consulta por radio sobre una rejilla: nunca construye la matriz densa
+        indptr, indices = radius_neighbors(
+            self.points[self.facilities], self.points, self.coverage_radius
+        )
+        return SparseCoverage(indptr, indices, self.num_demand_points)
+
+    def _build_bitset_coverage(self) -> BitsetCoverage:
+        # Misma consulta por radio, empaquetada en bits sin pasar por la matriz densa
+        indptr, indices = radius_neighbors(
+            self.points[self.facilities], self.points, self.coverage_radius
+        )
+        return BitsetCoverage.from_csr(indptr, indices, self.num_demand_points)
 
     def objective_function(self,
                            solution: np.ndarray):
-        facilities = solution.copy()
-        coverage = np.zeros(self.num_demand_points)
-
-        for i in range(self.num_locations):
-            if facilities[i] == 1:
-                for j in range(self.num_demand_points):
-                    if coverage[j] == 1:
-                        continue
-                    if self.distances[i, j] <= self.coverage_radius:
-                        coverage[j] = 1
-        fitness = np.sum(coverage * self.demands)
+        facilities = np.asarray(solution)
+        fitness = self.coverage.covered_weight(facilities == 1, self.demands)
         penalty = 0
         if np.sum(facilities) > self.max_facilities:
             penalty = np.sum(facilities) - self.max_facilities
         return -fitness + penalty * 1000
 
-    def solve(self):
+    def evaluate_population(self,
+                            population: np.ndarray) -> np.ndarray:
+        """
+        Evalúa una población completa en una sola operación matricial.
+
+        Parámetros:
+        population: matriz (pop_size, num_locations) de soluciones 0/1.
+
+        Retorna:
+        np.ndarray (pop_size,) con el mismo valor que `objective_function` para cada fila.
+        """
+        population = np.asarray(population).reshape(-1, self.num_locations)
+        fitness = self.coverage.covered_weight_population(population == 1, self.demands)
+        excess = population.sum(axis=1) - self.max_facilities
+        penalty = np.where(excess > 0, excess, 0)
+        return -fitness + penalty * 1000
+
+    def _attach_batch_evaluation(self, model: Optimizer) -> None:
+        """
+        Sustituye la evaluación agente por agente de mealpy por `evaluate_population`.
+        Requiere resolver en modo "swarm", donde mealpy evalúa cada generación completa
+        mediante `update_target_for_population`.
+        """
+        def update_target_for_population(pop):
+            fitness = self.evaluate_population(np.array([agent.solution for agent in pop]))
+            for agent, value in zip(pop, fitness):
+                agent.target = Target(objectives=[value], weights=model.problem.obj_weights)
+            model.nfe_counter += len(pop)
+            return pop
+
+        def generate_population(pop_size=None):
+            if pop_size is None:
+                pop_size = model.pop_size
+            pop = [model.generate_empty_agent() for _ in range(pop_size)]
+            return update_target_for_population(pop)
+
+        model.update_target_for_population = update_target_for_population
+        # Algunos algoritmos (p. ej. PSO) completan el agente en generate_agent
+        if type(model).generate_agent is Optimizer.generate_agent:
+            model.generate_population = generate_population
+
+    def solve(self,
+              method: str = "bbo",
+              time_budget: Optional[float] = None,
+              patience: Optional[int] = None,
+              seed: Optional[int] = None,
+              on_epoch: Optional[Callable[[int, float, np.ndarray], bool]] = None):
+        """
+        Resuelve el modelo con el método indicado.
+
+        Parámetros:
+        method: "greedy" o una metaheurística de METAHEURISTICS.
+        time_budget: tiempo máximo de reloj (segundos) para la búsqueda.
+        patience: épocas consecutivas sin mejorar el mejor fitness antes de parar.
+        seed: semilla de la metaheurística, para resultados reproducibles.
+        on_epoch: función llamada al final de cada época con (época, mejor fitness,
+            mejor solución 0/1); si retorna False la búsqueda se detiene.
+
+        Retorna:
+        dict con la solución, las épocas ejecutadas, el historial del mejor fitness
+        y el motivo de parada ("max_epochs", "time_budget", "patience", "converged"
+        o "cancelled").
+        """
+        started = time.perf_counter()
+        deadline = started + time_budget if time_budget is not None else None
+        if method == "greedy":
+            result = self._solve_greedy(deadline)
+        elif method in METAHEURISTICS:
+            result = self._solve_metaheuristic(METAHEURISTICS[method](), deadline, patience, seed, on_epoch)
+        else:
+            raise ValueError(f"Unknown method '{method}'. Supported methods: {', '.join(SOLVE_METHODS)}.")
+        result['elapsed_seconds'] = time.perf_counter() - started
+        return result
+
+    def _solve_greedy(self, deadline: Optional[float] = None, selected: Optional[List[int]] = None):
+        # `selected`: selección voraz ya calculada (p. ej. un prefijo de otra de mayor tamaño)
+        if selected is None:
+            selected = lazy_greedy(self.coverage, self.demands, self.max_facilities)
+        selected = swap_local_search(self.coverage, self.demands, selected, deadline=deadline)
+        solution = np.zeros(self.num_locations, dtype=int)
+        solution[selected] = 1
+        fitness = float(self.objective_function(solution))
+        timed_out = deadline is not None and time.perf_counter() >= deadline
+        return {
+            'id': 0,
+            'target': [fitness],
+            'Fitness': fitness,
+            'solution': solution.tolist(),
+            'epochs_run': 1,
+            'fitness_history': [fitness],
+            'stop_reason': "time_budget" if timed_out else "converged"
+        }
+
+    def _solve_metaheuristic(self,
+                             model: Optimizer,
+                             deadline: Optional[float] = None,
+                             patience: Optional[int] = None,
+                             seed: Optional[int] = None,
+                             on_epoch: Optional[Callable[[int, float, np.ndarray], bool]] = None):
         problem_constrained = {
             "obj_func": self.objective_function,
             "bounds": BinaryVar(n_vars=self.num_locations),
             "minmax": "min",
         }
-        model = BBO.OriginalBBO(epoch=500, pop_size=50)
-        result = model.solve(problem_constrained)
+        self._attach_batch_evaluation(model)
+        try:
+            result, history, stop_reason = self._run_epochs(
+                model, problem_constrained, deadline, patience, seed, on_epoch
+            )
+        finally:
+            # Los cierres referencian al modelo y a self: se quitan para no dejar un ciclo
+            model.__dict__.pop("update_target_for_population", None)
+            model.__dict__.pop("generate_population", None)
         return {
             'id': result.id,
-            'target': list(result.target.objectives),
-            'Fitness': result.target.fitness,
-            'solution': list(result.solution)
+            'target': [float(value) for value in result.target.objectives],
+            'Fitness': float(result.target.fitness),
+            # Misma regla de selección que objective_function
+            'solution': (np.asarray(result.solution) == 1).astype(int).tolist(),
+            'epochs_run': len(history),
+            'fitness_history': history,
+            'stop_reason': stop_reason
         }
+
+    @staticmethod
+    def _run_epochs(model: Optimizer,
+                    problem,
+                    deadline: Optional[float] = None,
+                    patience: Optional[int] = None,
+                    seed: Optional[int] = None,
+                    on_epoch: Optional[Callable[[int, float, np.ndarray], bool]] = None):
+        """
+        Mismo ciclo que `Optimizer.solve` de mealpy en modo "swarm", pero comprobando
+        el presupuesto de tiempo, la paciencia y `on_epoch` al final de cada época.
+        """
+        model.check_problem(problem, seed)
+        model.check_mode_and_workers("swarm", None)
+        model.check_termination("start", None, None)
+        model.initialize_variables()
+        model.before_initialization(None)
+        model.initialization()
+        model.after_initialization()
+        model.before_main_loop()
+
+        history = []
+        stop_reason = "max_epochs"
+        best_fitness, stale_epochs = model.g_best.target.fitness, 0
+        for epoch in range(1, model.epoch + 1):
+            time_epoch = time.perf_counter()
+            model.evolve(epoch)
+            pop_temp, model.g_best = model.update_global_best_agent(model.pop)
+            if model.sort_flag:
+                model.pop = pop_temp
+            model.track_optimize_step(model.pop, epoch, time.perf_counter() - time_epoch)
+
+            fitness = model.g_best.target.fitness
+            history.append(float(fitness))
+            if fitness < best_fitness - PATIENCE_EPSILON:
+                best_fitness, stale_epochs = fitness, 0
+            else:
+                stale_epochs += 1
+            if on_epoch is not None:
+                solution = (np.asarray(model.g_best.solution) == 1).astype(int)
+                if on_epoch(epoch, float(fitness), solution) is False:
+                    stop_reason = "cancelled"
+                    break
+            if deadline is not None and time.perf_counter() >= deadline:
+                stop_reason = "time_budget"
+                break
+            if patience is not None and stale_epochs >= patience:
+                stop_reason = "patience"
+                break
+        model.track_optimize_process()
+        return model.g_best, history, stop_reason
+
+    def solve_multistart(self,
+                         methods: List[str] = ("bbo",),
+                         n_runs: int = 4,
+                         n_workers: Optional[int] = None,
+                         seed: Optional[int] = None,
+                         time_budget: Optional[float] = None,
+                         patience: Optional[int] = None,
+                         stop_event=None):
+        """
+        Lanza `n_runs` ejecuciones independientes con semillas distintas en un pool
+        de procesos, alternando entre `methods`. Cada trabajador recibe el modelo
+        (con la cobertura ya calculada) una sola vez al iniciarse.
+
+        Retorna:
+        El resultado de la mejor ejecución, con las estadísticas de todas en 'runs'.
+        """
+        for method in methods:
+            if method not in METAHEURISTICS:
+                raise ValueError(f"Multi-start requires a metaheuristic. Supported methods: {', '.join(METAHEURISTICS)}.")
+        if seed is None:
+            seed = int(np.random.default_rng().integers(2**31 - n_runs))
+        if n_workers is None:
+            n_workers = os.cpu_count() or 1
+        n_workers = max(1, min(n_workers, n_runs))
+        tasks = [(methods[run % len(methods)], seed + run) for run in range(n_runs)]
+
+        started = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_multistart_worker,
+                                 initargs=(self,)) as executor:
+            results = list(executor.map(
+                _run_single_start, *zip(*tasks),
+                [time_budget] * n_runs, [patience] * n_runs, [stop_event] * n_runs
+            ))
+        best = dict(min(results, key=lambda result: result['Fitness']))
+        best['runs'] = [
+            {
+                'method': method,
+                'seed': run_seed,
+                'Fitness': result['Fitness'],
+                'epochs_run': result['epochs_run'],
+                'stop_reason': result['stop_reason'],
+                'elapsed_seconds': result['elapsed_seconds']
+            }
+            for (method, run_seed), result in zip(tasks, results)
+        ]
+        best['elapsed_seconds'] = time.perf_counter() - started
+        return best
+
+
+# Modelo compartido por las ejecuciones de un trabajador de solve_multistart
+_multistart_model: Optional[MaximalCoveringLocation] = None
+
+
+def _init_multistart_worker(model: MaximalCoveringLocation) -> None:
+    global _multistart_model
+    _multistart_model = model
+
+
+def _run_single_start(method: str, seed: int, time_budget: Optional[float], patience: Optional[int],
+                      stop_event=None):
+    on_epoch = _progress_reporter(stop_event, None, 0.0) if stop_event is not None else None
+    return _multistart_model.solve(
+        method=method, time_budget=time_budget, patience=patience, seed=seed, on_epoch=on_epoch
+    )
+
+
+def sweep_covering_location(points: List[Tuple[float, float]],
+                            demands: List[float],
+                            facilities: Optional[List[int]],
+                            coverage_radii: List[float],
+                            max_facilities_values: List[int],
+                            method: str = "greedy",
+                            coverage_format: str = "auto",
+                            time_budget: Optional[float] = None,
+                            patience: Optional[int] = None,
+                            seed: Optional[int] = None,
+                            n_workers: Optional[int] = None,
+                            num_candidates: Optional[int] = None):
+    """
+    Resuelve todos los escenarios (radio, número de instalaciones) de la rejilla
+    coverage_radii × max_facilities_values.
+
+    Las distancias se calculan una sola vez, con el radio máximo, y la cobertura
+    de cada radio se obtiene como prefijo de la estructura anidada. Cada radio se
+    resuelve en un proceso; con "greedy" la selección voraz del mayor k da, por
+    prefijos, el punto de partida de todos los k menores.
+
+    Sin `facilities` los candidatos se proponen con k-means (ver
+    `candidate_facilities`) y se comparten entre todos los escenarios.
+
+    Retorna:
+    dict con 'scenarios' (uno por par, ordenados por radio y k), 'facilities' y
+    'elapsed_seconds'.
+    """
+    if method not in SOLVE_METHODS:
+        raise ValueError(f"Unknown method '{method}'. Supported methods: {', '.join(SOLVE_METHODS)}.")
+    coverage_radii = sorted(set(float(radius) for radius in coverage_radii))
+    max_facilities_values = sorted(set(int(k) for k in max_facilities_values))
+    if seed is None:
+        seed = int(np.random.default_rng().integers(2**31 - len(coverage_radii) * len(max_facilities_values)))
+
+    started = time.perf_counter()
+    facilities = candidate_facilities(points, demands, facilities, num_candidates, seed)
+    points_array = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    facilities_array = np.array(facilities, dtype=np.int32)
+    nested = NestedCoverage(
+        *radius_neighbors(points_array[facilities_array], points_array, coverage_radii[-1],
+                          return_distance=True),
+        num_demand_points=len(points_array)
+    )
+    sweep = _SweepContext(points, demands, facilities, nested, max_facilities_values,
+                          method, coverage_format, time_budget, patience)
+    tasks = [(radius, seed + position * len(max_facilities_values))
+             for position, radius in enumerate(coverage_radii)]
+
+    if n_workers is None:
+        n_workers = os.cpu_count() or 1
+    n_workers = max(1, min(n_workers, len(tasks)))
+    if n_workers == 1:
+        results = [sweep.solve_radius(radius, radius_seed) for radius, radius_seed in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_sweep_worker,
+                                 initargs=(sweep,)) as executor:
+            results = list(executor.map(_run_sweep_radius, *zip(*tasks)))
+    return {
+        'scenarios': [scenario for scenarios in results for scenario in scenarios],
+        'facilities': facilities,
+        'elapsed_seconds': time.perf_counter() - started
+    }
+
+
+class _SweepContext(object):
+    """
+    Datos compartidos por los escenarios de un barrido; se envía una vez a cada trabajador.
+    """
+
+    def __init__(self, points, demands, facilities, nested: NestedCoverage,
+                 max_facilities_values: List[int], method: str, coverage_format: str,
+                 time_budget: Optional[float], patience: Optional[int]) -> None:
+        self.points = points
+        self.demands = demands
+        self.facilities = facilities
+        self.nested = nested
+        self.max_facilities_values = max_facilities_values
+        self.method = method
+        self.coverage_format = coverage_format
+        self.time_budget = time_budget
+        self.patience = patience
+
+    def solve_radius(self, radius: float, seed: int):
+        coverage = self.nested.at_radius(radius)
+        coverage_format = self.coverage_format
+        if coverage_format == "auto":
+            dense = coverage.num_locations * coverage.num_demand_points <= DENSE_MAX_CELLS
+            coverage_format = "dense" if dense else "sparse"
+        if coverage_format == "dense":
+            coverage = coverage.to_dense()
+        elif coverage_format == "bitset":
+            coverage = coverage.to_bitset()
+        demands = np.asarray(self.demands, dtype=np.float64)
+        total_demand = float(demands.sum())
+        greedy_order = None
+        if self.method == "greedy":
+            greedy_order = lazy_greedy(coverage, demands, self.max_facilities_values[-1])
+
+        scenarios = []
+        for position, max_facilities in enumerate(self.max_facilities_values):
+            model = MaximalCoveringLocation(
+                points=self.points,
+                demands=self.demands,
+                facilities=self.facilities,
+                max_facilities=max_facilities,
+                coverage_radius=radius,
+                use_cache=False,
+                coverage_format=coverage_format,
+                coverage=coverage
+            )
+            scenario_started = time.perf_counter()
+            if greedy_order is not None:
+                deadline = scenario_started + self.time_budget if self.time_budget is not None else None
+                result = model._solve_greedy(deadline, selected=greedy_order[:max_facilities])
+            else:
+                result = model.solve(method=self.method, time_budget=self.time_budget,
+                                     patience=self.patience, seed=seed + position)
+            solution = np.asarray(result['solution'])
+            covered_demand = float(coverage.covered_weight(solution == 1, demands))
+            scenarios.append({
+                'coverage_radius': radius,
+                'max_facilities': max_facilities,
+                'Fitness': result['Fitness'],
+                'covered_demand': covered_demand,
+                'coverage_ratio': covered_demand / total_demand if total_demand > 0 else 0.0,
+                'solution': result['solution'],
+                'stop_reason': result['stop_reason'],
+                'elapsed_seconds': time.perf_counter() - scenario_started
+            })
+        return scenarios
+
+
+# Barrido compartido por los radios que resuelve un trabajador de sweep_covering_location
+_sweep_context: Optional[_SweepContext] = None
+
+
+def _init_sweep_worker(sweep: _SweepContext) -> None:
+    global _sweep_context
+    _sweep_context = sweep
+
+
+def _run_sweep_radius(radius: float, seed: int):
+    return _sweep_context.solve_radius(radius, seed)
+
+
+def evaluate_configurations(points: List[Tuple[float, float]],
+                            demands: List[float],
+                            facilities: List[int],
+                            coverage_radius: float,
+                            configurations: List[List[int]],
+                            coverage_format: str = "auto",
+                            top_uncovered: int = 10):
+    """
+    Evalúa configuraciones 0/1 propuestas a mano sobre la misma cobertura (en
+    caché) que usa el solver, todas en una sola operación por lotes.
+
+    Retorna:
+    Lista con, para cada configuración, la demanda cubierta, la proporción
+    cubierta, las instalaciones abiertas y los `top_uncovered` puntos de demanda
+    no cubiertos con más demanda.
+    """
+    model = MaximalCoveringLocation(
+        points=points,
+        demands=demands,
+        facilities=facilities,
+        max_facilities=len(facilities),
+        coverage_radius=coverage_radius,
+        coverage_format=coverage_format
+    )
+    selected = np.asarray(configurations).reshape(-1, model.num_locations) == 1
+    covered = model.coverage.covered_population(selected)
+    covered_demand = covered @ model.demands
+    total_demand = float(model.demands.sum())
+
+    # Demanda no cubierta por configuración; los puntos cubiertos quedan fuera con -1
+    uncovered = np.where(covered, -1.0, model.demands)
+    top = min(top_uncovered, model.num_demand_points)
+    hotspots = np.empty((len(selected), 0), dtype=np.int64)
+    if top > 0:
+        hotspots = np.argpartition(-uncovered, top - 1, axis=1)[:, :top]
+        order = np.argsort(-np.take_along_axis(uncovered, hotspots, axis=1), axis=1, kind="stable")
+        hotspots = np.take_along_axis(hotspots, order, axis=1)
+
+    evaluations = []
+    for index, configuration in enumerate(selected):
+        evaluations.append({
+            'index': index,
+            'facilities_opened': int(configuration.sum()),
+            'covered_demand': float(covered_demand[index]),
+            'coverage_ratio': float(covered_demand[index]) / total_demand if total_demand > 0 else 0.0,
+            'uncovered_hotspots': [
+                {
+                    'point_index': int(point),
+                    'latitude': float(model.points[point, 0]),
+                    'longitude': float(model.points[point, 1]),
+                    'demand': float(model.demands[point])
+                }
+                for point in hotspots[index] if uncovered[index, point] > 0
+            ]
+        })
+    return evaluations
+
+
+def solve_covering_location(points: List[Tuple[float, float]],
+                            demands: List[float],
+                            facilities: Optional[List[int]],
+                            max_facilities: int,
+                            coverage_radius: float,
+                            method: str = "bbo",
+                            coverage_format: str = "auto",
+                            time_budget: Optional[float] = None,
+                            patience: Optional[int] = None,
+                            seed: Optional[int] = None,
+                            n_starts: int = 1,
+                            n_workers: Optional[int] = None,
+                            stop_event=None,
+                            progress_queue=None,
+                            progress_interval: float = 0.5,
+                            num_candidates: Optional[int] = None):
+    """
+    Construye y resuelve un MaximalCoveringLocation. Función de nivel de módulo
+    para poder enviarla a un pool de procesos. Con `n_starts` > 1 y una
+    metaheurística lanza ejecuciones independientes en paralelo.
+
+    `stop_event` (un Event de multiprocessing) detiene la búsqueda al activarse y
+    `progress_queue` recibe el progreso por época, como mucho una vez cada
+    `progress_interval` segundos (sólo en ejecuciones individuales).
+
+    Sin `facilities` se proponen `num_candidates` candidatos con k-means sobre
+    los puntos de demanda; el resultado incluye en 'facilities' los candidatos
+    usados, a los que se refiere 'solution'.
+    """
+    facilities = candidate_facilities(points, demands, facilities, num_candidates, seed)
+    optimizer = MaximalCoveringLocation(
+        points=points,
+        demands=demands,
+        facilities=facilities,
+        max_facilities=max_facilities,
+        coverage_radius=coverage_radius,
+        coverage_format=coverage_format
+    )
+    if n_starts > 1 and method in METAHEURISTICS:
+        result = optimizer.solve_multistart(
+            methods=[method], n_runs=n_starts, n_workers=n_workers, seed=seed,
+            time_budget=time_budget, patience=patience, stop_event=stop_event
+        )
+    else:
+        on_epoch = None
+        if stop_event is not None or progress_queue is not None:
+            on_epoch = _progress_reporter(stop_event, progress_queue, progress_interval)
+        result = optimizer.solve(
+            method=method, time_budget=time_budget, patience=patience, seed=seed, on_epoch=on_epoch
+        )
+    result['facilities'] = facilities
+    return result
+
+
+def _progress_reporter(stop_event, progress_queue, progress_interval: float):
+    started = time.perf_counter()
+    last_report = float("-inf")
+
+    def on_epoch(epoch: int, fitness: float, solution: np.ndarray) -> bool:
+        nonlocal last_report
+        if stop_event is not None and stop_event.is_set():
+            return False
+        now = time.perf_counter()
+        if progress_queue is not None and now - last_report >= progress_interval:
+            last_report = now
+            progress_queue.put({
+                'epoch': epoch,
+                'Fitness': fitness,
+                'solution': solution.tolist(),
+                'elapsed_seconds': now - started
+            })
+        return True
+
+    return on_epoch
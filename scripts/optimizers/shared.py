@@ -0,0 +1,399 @@
+"""
+Publicación de matrices y coberturas en memoria compartida
+(multiprocessing.shared_memory) para que todos los procesos de la máquina usen
+una sola copia.
+
+Cada valor se guarda en un segmento cuyo nombre se deriva de su clave de caché,
+así que cualquier proceso (otro worker de uvicorn, un trabajador de solve_multistart)
+puede adjuntarse sin copiar. La cabecera del segmento lleva una tabla de
+procesos titulares (pid y número de referencias), protegida con un bloqueo de
+fichero; el segmento se elimina cuando el último titular suelta su referencia.
+Dentro de un proceso, la referencia la mantiene cada arreglo construido sobre el
+segmento (su cadena `.base` llega al SharedBlock), así que el mapeo no se cierra
+mientras quede un arreglo vivo. La referencia se suelta en la siguiente
+operación sobre segmentos (o al salir el proceso, también los trabajadores de un
+pool), nunca desde el recolector de basura.
+
+Un proceso que muere sin soltar sus referencias (SIGKILL, OOM) deja su entrada
+en la tabla; `cleanup_stale_segments` (llamada antes de cada publicación, o con
+`python -m scripts.optimizers.shared`) quita los titulares muertos y elimina los
+segmentos que quedan sin ninguno.
+"""
+import collections
+import copyreg
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import weakref
+import numpy as np
+from contextlib import contextmanager
+from multiprocessing import resource_tracker, shared_memory, util
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+from scripts.optimizers.coverage import BitsetCoverage, DenseCoverage, SparseCoverage
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# Sólo se publican valores a partir de este tamaño; los pequeños quedan en el proceso
+SHARED_MIN_BYTES = int(os.environ.get("OPTIMIZER_SHARED_MIN_BYTES", 8 * 1024 * 1024))
+SHARED_MEMORY_ENABLED = os.environ.get("OPTIMIZER_SHARED_MEMORY", "1") != "0" and fcntl is not None
+
+SEGMENT_PREFIX = "mclp_"
+SHM_DIR = "/dev/shm"
+LOCK_PATH = os.path.join(tempfile.gettempdir(), "mclp-shared-memory.lock")
+
+# Cabecera (int64): longitud de los metadatos JSON, inicio de los datos y
+# HOLDER_SLOTS pares (pid, referencias); los offsets de los metadatos son
+# relativos al inicio de los datos
+HOLDER_SLOTS = 64
+HEADER_FIELDS = 2 + 2 * HOLDER_SLOTS
+HEADER_BYTES = HEADER_FIELDS * 8
+ALIGNMENT = 64
+
+_thread_lock = threading.Lock()
+
+# Segmentos liberados que aún tienen vistas vivas: no se pueden cerrar todavía
+_unclosed = []
+
+# Liberaciones pendientes. El finalizador de un bloque puede ejecutarse dentro de
+# la recolección de basura mientras este mismo hilo tiene el bloqueo, así que sólo
+# encola; la cola se vacía fuera del bloqueo (_drain_releases)
+_pending_releases = collections.deque()
+_live_blocks = weakref.WeakSet()
+_exit_hook_pid = None
+
+
+class SharedBlock(object):
+    """
+    Referencia de este proceso a un segmento; se libera al ser recolectada.
+    La mantienen los arreglos y coberturas construidos sobre el segmento.
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, name: str) -> None:
+        self.shm = shm
+        self.name = name
+        self._finalizer = weakref.finalize(self, _pending_releases.append, (shm, os.getpid()))
+        _live_blocks.add(self)
+        _register_exit_hook()
+
+
+class _BlockBoundArray(object):
+    """
+    Expone un arreglo sobre el segmento mediante __array_interface__: el arreglo
+    que NumPy construye a partir de él lo tiene como `.base`, y con él al bloque.
+    """
+
+    def __init__(self, array: np.ndarray, block: SharedBlock) -> None:
+        self.__array_interface__ = array.__array_interface__
+        self._array = array
+        self._block = block
+
+
+def segment_name(key: Hashable) -> str:
+    return SEGMENT_PREFIX + hashlib.blake2b(repr(key).encode(), digest_size=12).hexdigest()
+
+
+@contextmanager
+def _segment_lock():
+    with _thread_lock, open(LOCK_PATH, "a+") as handle:
+        fcntl.flock(handle, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+def _untrack(shm: shared_memory.SharedMemory) -> None:
+    # La vida del segmento la decide el contador, no el resource_tracker del proceso
+    try:
+        resource_tracker.unregister(shm._name, "shared_memory")
+    except Exception:
+        pass
+
+
+def _header(shm: shared_memory.SharedMemory) -> np.ndarray:
+    return np.ndarray((HEADER_FIELDS,), dtype=np.int64, buffer=shm.buf)
+
+
+def _holders(header: np.ndarray) -> np.ndarray:
+    # Vista (HOLDER_SLOTS, 2) de los pares (pid, referencias)
+    return header[2:].reshape(HOLDER_SLOTS, 2)
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _acquire(header: np.ndarray) -> bool:
+    """
+    Suma una referencia de este proceso; False si la tabla de titulares está llena.
+    """
+    holders = _holders(header)
+    pid = os.getpid()
+    slot = np.flatnonzero(holders[:, 0] == pid)
+    if len(slot) == 0:
+        slot = np.flatnonzero(holders[:, 0] == 0)
+        if len(slot) == 0:
+            return False
+        holders[slot[0]] = (pid, 0)
+    holders[slot[0], 1] += 1
+    return True
+
+
+def _unlink(shm: shared_memory.SharedMemory) -> None:
+    # unlink() también lo desregistra del resource_tracker: se registra antes
+    resource_tracker.register(shm._name, "shared_memory")
+    shm.unlink()
+
+
+def _release(shm: shared_memory.SharedMemory, owner_pid: int) -> None:
+    # Un hijo creado con fork hereda los bloques del padre, pero no sus referencias
+    if os.getpid() == owner_pid:
+        try:
+            with _segment_lock():
+                header = _header(shm)
+                holders = _holders(header)
+                slot = np.flatnonzero(holders[:, 0] == owner_pid)
+                if len(slot):
+                    holders[slot[0], 1] -= 1
+                    if holders[slot[0], 1] <= 0:
+                        holders[slot[0]] = (0, 0)
+                empty = not holders[:, 0].any()
+                del holders, header
+                if empty:
+                    _unlink(shm)
+        except FileNotFoundError:
+            pass
+    try:
+        shm.close()
+    except BufferError:
+        # Aún hay arreglos sobre el mapeo; se cierra al terminar el proceso
+        _unclosed.append(shm)
+
+
+def _drain_releases() -> None:
+    while True:
+        try:
+            shm, owner_pid = _pending_releases.popleft()
+        except IndexError:
+            return
+        _release(shm, owner_pid)
+
+
+def _release_all() -> None:
+    # Al salir se sueltan también los bloques aún vivos
+    for block in list(_live_blocks):
+        block._finalizer()
+    _drain_releases()
+
+
+def _register_exit_hook() -> None:
+    # Un trabajador creado con fork termina con os._exit sin pasar por atexit; los
+    # Finalize de multiprocessing sí se ejecutan al salir, en cualquier proceso
+    global _exit_hook_pid
+    if _exit_hook_pid != os.getpid():
+        _exit_hook_pid = os.getpid()
+        util.Finalize(None, _release_all, exitpriority=0)
+
+
+def _to_arrays(value: Any) -> Optional[Tuple[str, Dict[str, np.ndarray], Dict[str, Any]]]:
+    if isinstance(value, np.ndarray):
+        return "ndarray", {"array": value}, {}
+    if isinstance(value, DenseCoverage):
+        return "dense", {"matrix": value.matrix}, {}
+    if isinstance(value, SparseCoverage):
+        return "sparse", {"indptr": value.indptr, "indices": value.indices}, \
+            {"num_demand_points": value.num_demand_points}
+    if isinstance(value, BitsetCoverage):
+        return "bitset", {"words": value.words}, {"num_demand_points": value.num_demand_points}
+    return None
+
+
+def _from_arrays(kind: str, arrays: Dict[str, np.ndarray], meta: Dict[str, Any]) -> Any:
+    if kind == "ndarray":
+        return arrays["array"]
+    if kind == "dense":
+        return DenseCoverage(arrays["matrix"])
+    if kind == "sparse":
+        return SparseCoverage(arrays["indptr"], arrays["indices"], meta["num_demand_points"])
+    return BitsetCoverage(arrays["words"], meta["num_demand_points"])
+
+
+def _views(block: SharedBlock) -> Tuple[Any, SharedBlock]:
+    buffer = block.shm.buf
+    header = _header(block.shm)
+    meta_length, data_start = int(header[0]), int(header[1])
+    del header
+    meta = json.loads(bytes(buffer[HEADER_BYTES:HEADER_BYTES + meta_length]))
+    arrays = {}
+    for name, spec in meta["arrays"].items():
+        array = np.ndarray(
+            tuple(spec["shape"]), dtype=np.dtype(spec["dtype"]), buffer=buffer,
+            offset=data_start + spec["offset"]
+        )
+        array.setflags(write=False)
+        arrays[name] = np.asarray(_BlockBoundArray(array, block))
+    value = _from_arrays(meta["kind"], arrays, meta["meta"])
+    if not isinstance(value, np.ndarray):
+        value._shared_block = block
+    return value, block
+
+
+def _open(name: str) -> Optional[SharedBlock]:
+    _drain_releases()
+    with _segment_lock():
+        try:
+            shm = shared_memory.SharedMemory(name=name)
+        except FileNotFoundError:
+            return None
+        _untrack(shm)
+        header = _header(shm)
+        # Sin metadatos (publicación interrumpida) o sin hueco en la tabla de titulares
+        usable = header[0] != 0 and _acquire(header)
+        del header
+        if not usable:
+            shm.close()
+            return None
+    return SharedBlock(shm, name)
+
+
+def attach(key: Hashable) -> Optional[Tuple[Any, SharedBlock]]:
+    """
+    Valor publicado (por este u otro proceso) para `key` y la referencia que lo
+    mantiene, o None si no existe.
+    """
+    if not SHARED_MEMORY_ENABLED:
+        return None
+    block = _open(segment_name(key))
+    return None if block is None else _views(block)
+
+
+def _shm_available(size: int) -> bool:
+    # /dev/shm lleno provoca SIGBUS al escribir: se comprueba el espacio antes
+    try:
+        stats = os.statvfs(SHM_DIR)
+    except OSError:
+        return True
+    return stats.f_bavail * stats.f_frsize >= size
+
+
+def publish(key: Hashable, value: Any) -> Tuple[Any, Optional[SharedBlock]]:
+    """
+    Copia `value` a un segmento compartido y retorna el equivalente respaldado
+    por él junto con su referencia. Si ya existe un segmento con esa clave
+    retorna el existente; si el valor es pequeño o no es publicable, (value, None).
+    """
+    if not SHARED_MEMORY_ENABLED or getattr(value, "nbytes", 0) < SHARED_MIN_BYTES:
+        return value, None
+    packed = _to_arrays(value)
+    if packed is None:
+        return value, None
+    kind, arrays, meta = packed
+
+    layout, data_bytes = {}, 0
+    for array_name, array in arrays.items():
+        layout[array_name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": data_bytes}
+        data_bytes += -(-array.nbytes // ALIGNMENT) * ALIGNMENT
+    encoded = json.dumps({"kind": kind, "meta": meta, "arrays": layout}).encode()
+    data_start = -(-(HEADER_BYTES + len(encoded)) // ALIGNMENT) * ALIGNMENT
+    size = data_start + max(data_bytes, 1)
+    if not _shm_available(size):
+        return value, None
+
+    cleanup_stale_segments()
+    name = segment_name(key)
+    with _segment_lock():
+        try:
+            shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            shm = None
+        if shm is not None:
+            _untrack(shm)
+            for array_name, array in arrays.items():
+                target = np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf,
+                                    offset=data_start + layout[array_name]["offset"])
+                target[...] = array
+                del target
+            shm.buf[HEADER_BYTES:HEADER_BYTES + len(encoded)] = encoded
+            header = _header(shm)
+            header[:2] = (len(encoded), data_start)
+            _acquire(header)
+            del header
+    if shm is None:
+        shared = attach(key)
+        return (value, None) if shared is None else shared
+    return _views(SharedBlock(shm, name))
+
+
+def cleanup_stale_segments() -> List[str]:
+    """
+    Quita de cada segmento los titulares cuyo proceso ya no existe y elimina los
+    segmentos que quedan sin titulares. Retorna los nombres eliminados.
+    """
+    if not SHARED_MEMORY_ENABLED:
+        return []
+    _drain_releases()
+    try:
+        names = [entry for entry in os.listdir(SHM_DIR) if entry.startswith(SEGMENT_PREFIX)]
+    except OSError:
+        return []
+    removed = []
+    for name in names:
+        with _segment_lock():
+            try:
+                shm = shared_memory.SharedMemory(name=name)
+            except (FileNotFoundError, ValueError):
+                continue
+            _untrack(shm)
+            if shm.size < HEADER_BYTES:
+                shm.close()
+                continue
+            header = _header(shm)
+            holders = _holders(header)
+            for slot in np.flatnonzero(holders[:, 0]):
+                if not _pid_alive(int(holders[slot, 0])):
+                    holders[slot] = (0, 0)
+            # Las publicaciones se completan bajo el bloqueo: sin metadatos es una interrumpida
+            stale = header[0] == 0 or not holders[:, 0].any()
+            del holders, header
+            if stale:
+                _unlink(shm)
+                removed.append(name)
+            shm.close()
+    return removed
+
+
+def _attach_by_name(name: str) -> Any:
+    block = _open(name)
+    if block is None:
+        raise FileNotFoundError(f"Shared segment '{name}' no longer exists.")
+    value, _ = _views(block)
+    return value
+
+
+def _reduce_coverage(coverage: Any):
+    # Una cobertura compartida viaja a otro proceso como nombre de segmento
+    block = coverage.__dict__.get("_shared_block")
+    if block is None:
+        return object.__reduce_ex__(coverage, 2)
+    return _attach_by_name, (block.name,)
+
+
+for _cls in (DenseCoverage, SparseCoverage, BitsetCoverage):
+    copyreg.pickle(_cls, _reduce_coverage)
+
+
+if __name__ == "__main__":
+    removed = cleanup_stale_segments()
+    print(f"Removed {len(removed)} stale segment(s): {', '.join(removed) or '-'}")
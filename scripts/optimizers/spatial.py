@@ -0,0 +1,107 @@
+import numpy as np
+from typing import Sequence, Tuple
+
+from scripts.optimizers.geo import EARTH_RADIUS_KM, haversine_distance_pairs
+
+# Candidatos procesados por bloque al verificar las distancias exactas
+QUERY_CHUNK_SIZE = 512
+
+# Margen sobre el tamaño de celda para absorber el error de la proyección
+CELL_MARGIN = 1.01
+
+
+def _grid_cells(coords: np.ndarray, cell_lat: float, cell_lon: float,
+                num_lon_cells: int) -> Tuple[np.ndarray, np.ndarray]:
+    # La longitud es periódica: la columna se toma módulo num_lon_cells para que
+    # -180 y 180 caigan en celdas vecinas
+    return (
+        np.floor(coords[:, 0] / cell_lat).astype(np.int64),
+        np.floor((coords[:, 1] + 180.0) / cell_lon).astype(np.int64) % num_lon_cells,
+    )
+
+
+def expand_ranges(starts: np.ndarray, lengths: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Concatena los rangos [starts[k], starts[k] + lengths[k]) sin bucles de Python.
+
+    Retorna:
+    (positions, owners): posiciones concatenadas y el índice k al que pertenece cada una.
+    """
+    lengths = np.asarray(lengths, dtype=np.int64)
+    total = int(lengths.sum())
+    owners = np.repeat(np.arange(len(lengths)), lengths)
+    offsets = np.arange(total) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    positions = np.repeat(np.asarray(starts, dtype=np.int64), lengths) + offsets
+    return positions, owners
+
+
+def radius_neighbors(centers: Sequence[Tuple[float, float]],
+                     points: Sequence[Tuple[float, float]],
+                     radius: float,
+                     return_distance: bool = False):
+    """
+    Para cada centro, índices de los puntos a distancia Haversine <= radius (km),
+    en formato CSR (indptr, indices). Con `return_distance` retorna además la
+    distancia de cada par, (indptr, indices, distances).
+
+    Los puntos se agrupan en una rejilla equirectangular con celdas de al menos
+    `radius` de lado; cada centro sólo compara contra las 3 × 3 celdas vecinas y
+    confirma cada par con la distancia Haversine exacta, así que el resultado es
+    el mismo que umbralizar la matriz de distancias completa. Las columnas de la
+    rejilla dan la vuelta en ±180°, de modo que los pares que cruzan el
+    antimeridiano también se encuentran. La memoria escala
+    con el número de pares cubiertos, no con len(centers) × len(points).
+    """
+    centers = np.asarray(centers, dtype=np.float64).reshape(-1, 2)
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    num_centers = len(centers)
+    if num_centers == 0 or len(points) == 0:
+        empty = (np.zeros(num_centers + 1, dtype=np.int64), np.zeros(0, dtype=np.int32))
+        return empty + (np.zeros(0),) if return_distance else empty
+
+    # Lado de celda en grados: una diferencia de latitud/longitud mayor implica distancia > radius
+    cell_lat = np.rad2deg(radius / EARTH_RADIUS_KM) * CELL_MARGIN
+    max_abs_lat = min(np.abs(np.concatenate([centers[:, 0], points[:, 0]])).max() + cell_lat, 89.0)
+    cell_lon = cell_lat / np.cos(np.deg2rad(max_abs_lat))
+    cell_lat, cell_lon = max(cell_lat, 1e-9), max(cell_lon, 1e-9)
+    # Número entero de columnas en 360°, cada una de al menos cell_lon de ancho
+    width = max(int(360.0 // cell_lon), 1)
+    cell_lon = 360.0 / width
+    # Con menos de 3 columnas las vecinas se repetirían; se recorren todas una vez
+    column_offsets = (-1, 0, 1) if width >= 3 else tuple(range(width))
+
+    point_y, point_x = _grid_cells(points, cell_lat, cell_lon, width)
+    center_y, center_x = _grid_cells(centers, cell_lat, cell_lon, width)
+    min_y = min(point_y.min(), center_y.min()) - 1
+
+    point_keys = (point_y - min_y) * width + point_x
+    order = np.argsort(point_keys, kind="stable")
+    sorted_keys = point_keys[order]
+
+    indptr = np.zeros(num_centers + 1, dtype=np.int64)
+    chunks, distance_chunks = [], []
+    for start in range(0, num_centers, QUERY_CHUNK_SIZE):
+        stop = min(start + QUERY_CHUNK_SIZE, num_centers)
+        candidate_positions, candidate_owners = [], []
+        for dy in (-1, 0, 1):
+            for dx in column_offsets:
+                keys = (center_y[start:stop] + dy - min_y) * width + (center_x[start:stop] + dx) % width
+                left = np.searchsorted(sorted_keys, keys, side="left")
+                right = np.searchsorted(sorted_keys, keys, side="right")
+                positions, owners = expand_ranges(left, right - left)
+                candidate_positions.append(positions)
+                candidate_owners.append(owners)
+        owners = np.concatenate(candidate_owners)
+        neighbors = order[np.concatenate(candidate_positions)]
+        distances = haversine_distance_pairs(centers[start + owners], points[neighbors])
+        within = distances <= radius
+        owners, neighbors, distances = owners[within], neighbors[within], distances[within]
+        by_owner = np.lexsort((neighbors, owners))
+        owners, neighbors = owners[by_owner], neighbors[by_owner]
+        indptr[start + 1:stop + 1] = np.bincount(owners, minlength=stop - start)
+        chunks.append(neighbors.astype(np.int32))
+        distance_chunks.append(distances[by_owner])
+    np.cumsum(indptr, out=indptr)
+    if return_distance:
+        return indptr, np.concatenate(chunks), np.concatenate(distance_chunks)
+    return indptr, np.concatenate(chunks)